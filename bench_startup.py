@@ -0,0 +1,53 @@
+﻿import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Обов'язкові секрети validate_config(); для заміру старту достатньо заглушок
+PLACEHOLDER_ENV = {"TELEGRAM_TOKEN": "bench", "GOOGLE_API_KEY": "bench", "GOOGLE_CSE_ID": "bench", "YOUTUBE_API_KEY": "bench"}
+
+# Час `import config` міряється всередині процесу, після імпорту залежностей: старт
+# інтерпретатора й завантаження pydantic/cryptography (сотні мс) не додають шуму
+IMPORT_TIMER = (
+    "import time, dotenv, pydantic, cryptography.fernet, cryptography.hazmat.primitives.kdf.pbkdf2; "
+    "start = time.perf_counter(); import config; print((time.perf_counter() - start) * 1000)"
+)
+
+def time_import(env):
+    """Час `import config` (мс) у свіжому інтерпретаторі."""
+    result = subprocess.run([sys.executable, "-c", IMPORT_TIMER], cwd=BASE_DIR, env=env,
+                            capture_output=True, text=True)
+    if result.returncode:
+        sys.exit(f"import config завершився з помилкою:\n{result.stderr}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк старту: PBKDF2 з кешем ключа і без нього")
+    parser.add_argument("--runs", type=int, default=15, help="Кількість запусків для кожного режиму")
+    args = parser.parse_args()
+
+    env = {**PLACEHOLDER_ENV, **os.environ}
+    samples = {"no_cache": [], "cold": [], "warm": []}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_path = os.path.join(temp_dir, "keyring.json")
+        # Режими чергуються, щоб дрейф навантаження машини діяв на всі однаково
+        for _ in range(args.runs):
+            samples["no_cache"].append(time_import({**env, "KEY_CACHE_PATH": ""}))
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            samples["cold"].append(time_import({**env, "KEY_CACHE_PATH": cache_path}))
+            samples["warm"].append(time_import({**env, "KEY_CACHE_PATH": cache_path}))
+    no_cache, cold, warm = (statistics.median(samples[mode]) for mode in ("no_cache", "cold", "warm"))
+
+    print(f"import config, медіана з {args.runs} запусків:")
+    print(f"Без кешу ключа (PBKDF2 кожен запуск): {no_cache:.1f} мс")
+    print(f"Перший запуск (PBKDF2 + запис кешу):  {cold:.1f} мс")
+    print(f"З кешем ключа:                        {warm:.1f} мс")
+    print(f"Прискорення: {no_cache - warm:.1f} мс ({no_cache / warm:.2f}x)")
+
+if __name__ == "__main__":
+    main()
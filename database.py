@@ -1,363 +1,973 @@
-﻿import sqlite3
-import asyncio
-import logging
-import os
-from config import BASE_DIR, DB_PATH, DB_TYPE, POSTGRES_URL
-import asyncpg
-from security import encrypt_data, decrypt_data
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
-
-async def init_db():
-    """Ініціалізація бази даних."""
-    try:
-        if DB_TYPE == "postgresql":
-            conn = await asyncpg.connect(POSTGRES_URL)
-            await conn.execute('''
-                CREATE TABLE IF NOT EXISTS history (
-                    id SERIAL PRIMARY KEY,
-                    user_id TEXT,
-                    query TEXT,
-                    response TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                CREATE TABLE IF NOT EXISTS context (
-                    user_id TEXT PRIMARY KEY,
-                    context_data TEXT
-                );
-                CREATE TABLE IF NOT EXISTS cache (
-                    query_hash TEXT PRIMARY KEY,
-                    response TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                CREATE TABLE IF NOT EXISTS suspicious_processes (
-                    id SERIAL PRIMARY KEY,
-                    process_name TEXT,
-                    cpu_percent REAL,
-                    memory_percent REAL,
-                    path TEXT,
-                    status TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                CREATE TABLE IF NOT EXISTS trades (
-                    id SERIAL PRIMARY KEY,
-                    user_id TEXT,
-                    symbol TEXT,
-                    side TEXT,
-                    quantity REAL,
-                    price REAL,
-                    status TEXT,
-                    is_testnet BOOLEAN,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                CREATE TABLE IF NOT EXISTS upgrades (
-                    id SERIAL PRIMARY KEY,
-                    user_id TEXT,
-                    upgrade_request TEXT,
-                    status TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                CREATE TABLE IF NOT EXISTS instructions (
-                    id SERIAL PRIMARY KEY,
-                    query TEXT,
-                    response TEXT,
-                    source TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            ''')
-            await conn.close()
-        else:
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT,
-                    query TEXT,
-                    response TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS context (
-                    user_id TEXT PRIMARY KEY,
-                    context_data TEXT
-                )
-            ''')
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS cache (
-                    query_hash TEXT PRIMARY KEY,
-                    response TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS suspicious_processes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    process_name TEXT,
-                    cpu_percent REAL,
-                    memory_percent REAL,
-                    path TEXT,
-                    status TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS trades (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT,
-                    symbol TEXT,
-                    side TEXT,
-                    quantity REAL,
-                    price REAL,
-                    status TEXT,
-                    is_testnet BOOLEAN,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS upgrades (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT,
-                    upgrade_request TEXT,
-                    status TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS instructions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    query TEXT,
-                    response TEXT,
-                    source TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            conn.commit()
-            conn.close()
-        logger.info("База даних ініціалізована")
-    except Exception as e:
-        logger.error(f"Помилка ініціалізації бази даних: {str(e)}")
-        from plugins.self_improvement import handle_error
-        await handle_error(str(e))
-
-async def save_interaction(user_id, query, response):
-    """Збереження взаємодії в базі даних."""
-    try:
-        encrypted_response = await encrypt_data(response, user_id)
-        if DB_TYPE == "postgresql":
-            conn = await asyncpg.connect(POSTGRES_URL)
-            await conn.execute(
-                "INSERT INTO history (user_id, query, response) VALUES ($1, $2, $3)",
-                user_id, query, encrypted_response
-            )
-            await conn.close()
-        else:
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            c.execute(
-                "INSERT INTO history (user_id, query, response) VALUES (?, ?, ?)",
-                (user_id, query, encrypted_response)
-            )
-            conn.commit()
-            conn.close()
-        logger.info(f"Взаємодія збережена для user_id: {user_id}")
-    except Exception as e:
-        logger.error(f"Помилка збереження взаємодії: {str(e)}")
-
-async def get_context(user_id):
-    """Отримання контексту користувача."""
-    try:
-        if DB_TYPE == "postgresql":
-            conn = await asyncpg.connect(POSTGRES_URL)
-            result = await conn.fetchrow("SELECT context_data FROM context WHERE user_id = $1", user_id)
-            await conn.close()
-            if result:
-                return await decrypt_data(result['context_data'], user_id=user_id)
-            return ""
-        else:
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            c.execute("SELECT context_data FROM context WHERE user_id = ?", (user_id,))
-            result = c.fetchone()
-            conn.close()
-            if result:
-                return await decrypt_data(result[0], user_id=user_id)
-            return ""
-    except Exception as e:
-        logger.error(f"Помилка отримання контексту: {str(e)}")
-        return ""
-
-async def save_context(user_id, context_data):
-    """Збереження контексту користувача."""
-    try:
-        encrypted_context = await encrypt_data(context_data, user_id)
-        if DB_TYPE == "postgresql":
-            conn = await asyncpg.connect(POSTGRES_URL)
-            await conn.execute(
-                "INSERT INTO context (user_id, context_data) VALUES ($1, $2) ON CONFLICT (user_id) DO UPDATE SET context_data = $2",
-                user_id, encrypted_context
-            )
-            await conn.close()
-        else:
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            c.execute(
-                "INSERT OR REPLACE INTO context (user_id, context_data) VALUES (?, ?)",
-                (user_id, encrypted_context)
-            )
-            conn.commit()
-            conn.close()
-        logger.info(f"Контекст збережено для user_id: {user_id}")
-    except Exception as e:
-        logger.error(f"Помилка збереження контексту: {str(e)}")
-
-async def get_cached_response(query_hash):
-    """Отримання кешованої відповіді."""
-    try:
-        if DB_TYPE == "postgresql":
-            conn = await asyncpg.connect(POSTGRES_URL)
-            result = await conn.fetchrow("SELECT response FROM cache WHERE query_hash = $1", query_hash)
-            await conn.close()
-            if result:
-                return await decrypt_data(result['response'])
-            return None
-        else:
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            c.execute("SELECT response FROM cache WHERE query_hash = ?", (query_hash,))
-            result = c.fetchone()
-            conn.close()
-            if result:
-                return await decrypt_data(result[0])
-            return None
-    except Exception as e:
-        logger.error(f"Помилка отримання кешованої відповіді: {str(e)}")
-        return None
-
-async def save_cached_response(query_hash, response):
-    """Збереження кешованої відповіді."""
-    try:
-        encrypted_response = await encrypt_data(response)
-        if DB_TYPE == "postgresql":
-            conn = await asyncpg.connect(POSTGRES_URL)
-            await conn.execute(
-                "INSERT INTO cache (query_hash, response) VALUES ($1, $2) ON CONFLICT (query_hash) DO UPDATE SET response = $2",
-                query_hash, encrypted_response
-            )
-            await conn.close()
-        else:
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            c.execute(
-                "INSERT OR REPLACE INTO cache (query_hash, response) VALUES (?, ?)",
-                (query_hash, encrypted_response)
-            )
-            conn.commit()
-            conn.close()
-        logger.info(f"Кешована відповідь збережена для: {query_hash}")
-    except Exception as e:
-        logger.error(f"Помилка збереження кешованої відповіді: {str(e)}")
-
-async def save_suspicious_process(process_info):
-    """Збереження інформації про підозрілий процес."""
-    try:
-        if DB_TYPE == "postgresql":
-            conn = await asyncpg.connect(POSTGRES_URL)
-            await conn.execute(
-                "INSERT INTO suspicious_processes (process_name, cpu_percent, memory_percent, path, status) VALUES ($1, $2, $3, $4, $5)",
-                process_info['name'], process_info['cpu_percent'], process_info['memory_percent'], process_info['path'], process_info['status']
-            )
-            await conn.close()
-        else:
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            c.execute(
-                "INSERT INTO suspicious_processes (process_name, cpu_percent, memory_percent, path, status) VALUES (?, ?, ?, ?, ?)",
-                (process_info['name'], process_info['cpu_percent'], process_info['memory_percent'], process_info['path'], process_info['status'])
-            )
-            conn.commit()
-            conn.close()
-        logger.info(f"Підозрілий процес збережено: {process_info['name']}")
-    except Exception as e:
-        logger.error(f"Помилка збереження підозрілого процесу: {str(e)}")
-
-async def save_trade(trade_info):
-    """Збереження торговельної угоди."""
-    try:
-        if DB_TYPE == "postgresql":
-            conn = await asyncpg.connect(POSTGRES_URL)
-            await conn.execute(
-                "INSERT INTO trades (user_id, symbol, side, quantity, price, status, is_testnet) VALUES ($1, $2, $3, $4, $5, $6, $7)",
-                trade_info['user_id'], trade_info['symbol'], trade_info['side'], trade_info['quantity'],
-                trade_info['price'], trade_info['status'], trade_info['is_testnet']
-            )
-            await conn.close()
-        else:
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            c.execute(
-                "INSERT INTO trades (user_id, symbol, side, quantity, price, status, is_testnet) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (trade_info['user_id'], trade_info['symbol'], trade_info['side'], trade_info['quantity'],
-                 trade_info['price'], trade_info['status'], trade_info['is_testnet'])
-            )
-            conn.commit()
-            conn.close()
-        logger.info(f"Угода збережена: {trade_info['symbol']}")
-    except Exception as e:
-        logger.error(f"Помилка збереження угоди: {str(e)}")
-
-async def save_upgrade(user_id, upgrade_request, source, status):
-    """Збереження запиту на оновлення."""
-    try:
-        if DB_TYPE == "postgresql":
-            conn = await asyncpg.connect(POSTGRES_URL)
-            await conn.execute(
-                "INSERT INTO upgrades (user_id, upgrade_request, status) VALUES ($1, $2, $3)",
-                user_id, upgrade_request, status
-            )
-            await conn.close()
-        else:
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            c.execute(
-                "INSERT INTO upgrades (user_id, upgrade_request, status) VALUES (?, ?, ?)",
-                (user_id, upgrade_request, status)
-            )
-            conn.commit()
-            conn.close()
-        logger.info(f"Оновлення збережено для user_id: {user_id}, джерело: {source}")
-    except Exception as e:
-        logger.error(f"Помилка збереження оновлення: {str(e)}")
-
-async def save_instruction(query, response, source):
-    """Збереження інструкції."""
-    try:
-        encrypted_response = await encrypt_data(response)
-        if DB_TYPE == "postgresql":
-            conn = await asyncpg.connect(POSTGRES_URL)
-            await conn.execute(
-                "INSERT INTO instructions (query, response, source) VALUES ($1, $2, $3)",
-                query, encrypted_response, source
-            )
-            await conn.close()
-        else:
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            c.execute(
-                "INSERT INTO instructions (query, response, source) VALUES (?, ?, ?)",
-                (query, encrypted_response, source)
-            )
-            conn.commit()
-            conn.close()
-        logger.info(f"Інструкція збережена для запиту: {query}")
-    except Exception as e:
-        logger.error(f"Помилка збереження інструкції: {str(e)}")
\ No newline at end of file
+﻿import sqlite3
+import asyncio
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from config import BASE_DIR, DB_PATH, DB_TYPE, POSTGRES_URL, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, SQLITE_POOL_SIZE, WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL
+from config import CACHE_MAX_ENTRIES, CACHE_DB_MAX_ROWS, CACHE_SWEEP_INTERVAL
+import asyncpg
+from security import encrypt_data, decrypt_data, decrypt_batch
+from utils.cache import LRUCache, ttl_for, single_flight
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+class SQLiteBackend:
+    """Асинхронний SQLite: окремий потік-записувач і пул потоків для читання в режимі WAL."""
+
+    def __init__(self, db_path, readers=SQLITE_POOL_SIZE):
+        self.db_path = db_path
+        self.readers = readers
+        self._jobs = queue.Queue()
+        self._writer = None
+        self._read_pool = None
+        self._local = threading.local()
+        self._read_connections = []
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._write_time = 0.0
+        self._reads = 0
+        self._read_time = 0.0
+        self._reads_active = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def start(self):
+        """Запуск потоку-записувача і пулу читачів."""
+        if self._writer:
+            return
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = self._connect()
+        # WAL дозволяє читачам дашборду не чекати на запис
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._writer = threading.Thread(target=self._write_loop, args=(conn,), name="sqlite-writer", daemon=True)
+        self._writer.start()
+        self._read_pool = ThreadPoolExecutor(max_workers=self.readers, thread_name_prefix="sqlite-reader")
+
+    def _write_loop(self, conn):
+        """Цикл потоку-записувача: одне з'єднання, послідовні транзакції."""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            func, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            start = time.perf_counter()
+            try:
+                result = func(conn)
+                conn.commit()
+                future.set_result(result)
+            except BaseException as e:
+                conn.rollback()
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._writes += 1
+                    self._write_time += time.perf_counter() - start
+        conn.close()
+
+    def _reader_connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+            self._local.conn = conn
+            with self._lock:
+                self._read_connections.append(conn)
+        return conn
+
+    def _read(self, func):
+        start = time.perf_counter()
+        with self._lock:
+            self._reads_active += 1
+        try:
+            return func(self._reader_connection())
+        finally:
+            with self._lock:
+                self._reads_active -= 1
+                self._reads += 1
+                self._read_time += time.perf_counter() - start
+
+    async def write(self, func):
+        """Виконання func(conn) у потоці-записувачі."""
+        self.start()
+        future = Future()
+        self._jobs.put((func, future))
+        return await asyncio.wrap_future(future)
+
+    async def read(self, func):
+        """Виконання func(conn) у пулі читачів."""
+        self.start()
+        return await asyncio.wrap_future(self._read_pool.submit(self._read, func))
+
+    async def execute(self, query, *args):
+        return await self.write(lambda conn: conn.execute(query, args).rowcount)
+
+    async def executemany(self, query, rows):
+        return await self.write(lambda conn: conn.executemany(query, rows).rowcount)
+
+    async def executescript(self, script):
+        return await self.write(lambda conn: conn.executescript(script))
+
+    async def fetchrow(self, query, *args):
+        return await self.read(lambda conn: conn.execute(query, args).fetchone())
+
+    async def fetch(self, query, *args):
+        return await self.read(lambda conn: conn.execute(query, args).fetchall())
+
+    def stats(self):
+        """Метрики потоку-записувача і пулу читачів."""
+        return {
+            "write_queue": self._jobs.qsize(),
+            "writes": self._writes,
+            "avg_write_ms": round(self._write_time / self._writes * 1000, 3) if self._writes else 0.0,
+            "readers": self.readers,
+            "readers_busy": self._reads_active,
+            "reads": self._reads,
+            "avg_read_ms": round(self._read_time / self._reads * 1000, 3) if self._reads else 0.0
+        }
+
+    def close(self):
+        """Зупинка записувача (після виконання черги) і закриття читачів."""
+        if self._writer:
+            self._jobs.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._read_pool:
+            self._read_pool.shutdown(wait=True)
+            self._read_pool = None
+        with self._lock:
+            for conn in self._read_connections:
+                conn.close()
+            self._read_connections.clear()
+        self._local = threading.local()
+
+class DatabaseEngine:
+    """Довгоживучий рушій бази даних: пул asyncpg або асинхронний бекенд SQLite."""
+
+    def __init__(self, db_type=DB_TYPE, db_path=DB_PATH, postgres_url=POSTGRES_URL,
+                 min_size=DB_POOL_MIN_SIZE, max_size=DB_POOL_MAX_SIZE, sqlite_pool_size=SQLITE_POOL_SIZE):
+        self.db_type = db_type
+        self.db_path = db_path
+        self.postgres_url = postgres_url
+        self.min_size = min_size
+        self.max_size = max_size
+        self.sqlite = SQLiteBackend(db_path, sqlite_pool_size)
+        # Пул asyncpg прив'язаний до event loop, а бот, GUI та фонові задачі працюють у різних потоках зі своїми циклами
+        self._pg_pools = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._waiting = 0
+        self._acquired = 0
+        self._saturated = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def start(self):
+        """Створення пулу з'єднань (викликається один раз з init_db)."""
+        if self._started:
+            return
+        if self.db_type == "postgresql":
+            await self._get_pg_pool()
+        else:
+            self.sqlite.start()
+        self._started = True
+        logger.info(f"Рушій бази даних запущено ({self.db_type})")
+
+    async def _get_pg_pool(self):
+        """Пул asyncpg для поточного event loop."""
+        loop = asyncio.get_running_loop()
+        pool = self._pg_pools.get(loop)
+        if pool is None:
+            pool = await asyncpg.create_pool(self.postgres_url, min_size=self.min_size, max_size=self.max_size)
+            self._pg_pools[loop] = pool
+        return pool
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Позичення з'єднання PostgreSQL з пулу."""
+        if not self._started:
+            await self.start()
+        pool = await self._get_pg_pool()
+        if pool.get_size() >= self.max_size and pool.get_idle_size() == 0:
+            self._saturated += 1
+        start = time.perf_counter()
+        self._waiting += 1
+        try:
+            conn = await pool.acquire()
+        finally:
+            self._waiting -= 1
+        wait = time.perf_counter() - start
+        with self._lock:
+            self._acquired += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            await pool.release(conn)
+
+    async def execute(self, query, *args):
+        if self.db_type == "postgresql":
+            async with self.acquire() as conn:
+                return await conn.execute(query, *args)
+        return await self.sqlite.execute(query, *args)
+
+    async def executemany(self, query, rows):
+        if self.db_type == "postgresql":
+            async with self.acquire() as conn:
+                return await conn.executemany(query, rows)
+        return await self.sqlite.executemany(query, rows)
+
+    async def executescript(self, script):
+        if self.db_type == "postgresql":
+            async with self.acquire() as conn:
+                return await conn.execute(script)
+        return await self.sqlite.executescript(script)
+
+    async def copy_records(self, table, columns, rows):
+        """Пакетна вставка: COPY для PostgreSQL, одна транзакція executemany для SQLite."""
+        if self.db_type == "postgresql":
+            async with self.acquire() as conn:
+                return await conn.copy_records_to_table(table, records=rows, columns=columns)
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        return await self.sqlite.executemany(query, rows)
+
+    async def fetchrow(self, query, *args):
+        if self.db_type == "postgresql":
+            async with self.acquire() as conn:
+                return await conn.fetchrow(query, *args)
+        return await self.sqlite.fetchrow(query, *args)
+
+    async def fetch(self, query, *args):
+        if self.db_type == "postgresql":
+            async with self.acquire() as conn:
+                return await conn.fetch(query, *args)
+        return await self.sqlite.fetch(query, *args)
+
+    def stats(self):
+        """Метрики заповнення пулу."""
+        if self.db_type != "postgresql":
+            return {"backend": self.db_type, **self.sqlite.stats()}
+        size = sum(pool.get_size() for pool in self._pg_pools.values())
+        idle = sum(pool.get_idle_size() for pool in self._pg_pools.values())
+        capacity = self.max_size * max(len(self._pg_pools), 1)
+        return {
+            "backend": self.db_type,
+            "size": size,
+            "idle": idle,
+            "in_use": self._in_use,
+            "capacity": capacity,
+            "utilization": round(self._in_use / capacity, 3) if capacity else 0.0,
+            "peak_in_use": self._peak_in_use,
+            "waiting": self._waiting,
+            "acquired": self._acquired,
+            "saturated_acquires": self._saturated,
+            "avg_wait_ms": round(self._total_wait / self._acquired * 1000, 3) if self._acquired else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 3)
+        }
+
+    async def close(self):
+        """Закриття всіх з'єднань."""
+        for loop, pool in list(self._pg_pools.items()):
+            try:
+                if loop is asyncio.get_running_loop():
+                    await pool.close()
+                else:
+                    pool.terminate()
+            except Exception as e:
+                logger.error(f"Помилка закриття пулу PostgreSQL: {str(e)}")
+        self._pg_pools.clear()
+        await asyncio.get_running_loop().run_in_executor(None, self.sqlite.close)
+        self._started = False
+        logger.info("Рушій бази даних зупинено")
+
+engine = DatabaseEngine()
+
+class WriteBehindBuffer:
+    """Буфер відкладеного запису: групує рядки і скидає їх пакетами за розміром або часом.
+
+    Рядок у буфері — (значення, future, спроби). Пакет, що не записався max_retries
+    разів, записується по рядку, а рядки з помилкою відкладаються в dead_letters,
+    щоб один зіпсований рядок не блокував таблицю.
+    """
+
+    COLUMNS = {
+        "history": ("user_id", "query", "response"),
+        "trades": ("user_id", "symbol", "side", "quantity", "price", "status", "is_testnet"),
+        "instructions": ("query", "response", "source"),
+        "suspicious_processes": ("process_name", "cpu_percent", "memory_percent", "path", "status"),
+        "upgrades": ("user_id", "upgrade_request", "status")
+    }
+
+    def __init__(self, db_engine, batch_size=WRITE_BATCH_SIZE, flush_interval=WRITE_FLUSH_INTERVAL, max_pending=10000, max_retries=3):
+        self.engine = db_engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.dead_letters = deque(maxlen=max_pending)
+        self._pending = {table: [] for table in self.COLUMNS}
+        self._count = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._loop = None
+        self._wakeup = None
+        self._stopping = False
+        self._flushes = 0
+        self._flushed_rows = 0
+        self._dropped_rows = 0
+        self._dead_rows = 0
+        self._last_flush_ms = 0.0
+
+    def start(self):
+        """Запуск фонового потоку скидання."""
+        with self._lock:
+            if self._thread:
+                return
+            self._stopping = False
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._thread_main, args=(ready,), name="db-write-behind", daemon=True)
+            self._thread.start()
+        ready.wait()
+
+    def _thread_main(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
+        ready.set()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+        await self.flush()
+
+    def _notify(self):
+        loop = self._loop
+        if loop and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def add(self, table, row, sync=False):
+        """Додавання рядка; sync=True повертається лише після коміту рядка (читання після запису).
+
+        Помилку синхронного запису отримує викликач — рядок не повторюється.
+        """
+        # Future з concurrent.futures: рядок може записати і фоновий потік, якщо забере його першим
+        written = Future() if sync else None
+        with self._lock:
+            self._pending[table].append((row, written, 0))
+            self._count += 1
+            full = self._count >= self.batch_size
+        if sync:
+            await self.flush()
+            await asyncio.wrap_future(written)
+            return
+        if not self._thread:
+            self.start()
+        if full:
+            self._notify()
+
+    def _take(self):
+        with self._lock:
+            batches = {table: rows for table, rows in self._pending.items() if rows}
+            self._pending = {table: [] for table in self.COLUMNS}
+            self._count = 0
+        return batches
+
+    def _restore(self, table, entries):
+        with self._lock:
+            if self._count + len(entries) > self.max_pending:
+                self._dropped_rows += len(entries)
+                logger.error(f"Буфер запису переповнений, втрачено {len(entries)} рядків для {table}")
+                return
+            self._pending[table][:0] = [(row, None, attempts + 1) for row, _, attempts in entries]
+            self._count += len(entries)
+
+    async def _write(self, table, entries):
+        await self.engine.copy_records(table, self.COLUMNS[table], [row for row, _, _ in entries])
+        with self._lock:
+            self._flushed_rows += len(entries)
+
+    async def _write_sync(self, table, entries):
+        # Окремий пакет: синхронний рядок не падає через чужий зіпсований рядок
+        try:
+            await self._write(table, entries)
+        except Exception as e:
+            logger.error(f"Помилка синхронного запису в {table}: {str(e)}")
+            for _, written, _ in entries:
+                written.set_exception(e)
+            return
+        for _, written, _ in entries:
+            written.set_result(None)
+
+    async def _write_isolated(self, table, entries):
+        # Пакет вичерпав спроби: по рядку, щоб відкласти лише ті, що не записуються
+        for entry in entries:
+            try:
+                await self._write(table, [entry])
+            except Exception as e:
+                logger.error(f"Рядок для {table} відкладено після {entry[2] + 1} спроб: {str(e)}")
+                with self._lock:
+                    self.dead_letters.append((table, entry[0]))
+                    self._dead_rows += 1
+
+    async def flush(self):
+        """Скидання всіх накопичених рядків у базу даних."""
+        batches = self._take()
+        if not batches:
+            return
+        start = time.perf_counter()
+        for table, entries in batches.items():
+            synced = [entry for entry in entries if entry[1]]
+            if synced:
+                await self._write_sync(table, synced)
+            entries = [entry for entry in entries if not entry[1]]
+            if not entries:
+                continue
+            try:
+                await self._write(table, entries)
+            except Exception as e:
+                logger.error(f"Помилка пакетного запису в {table}: {str(e)}")
+                if max(attempts for _, _, attempts in entries) + 1 >= self.max_retries:
+                    await self._write_isolated(table, entries)
+                else:
+                    self._restore(table, entries)
+        with self._lock:
+            self._flushes += 1
+            self._last_flush_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    def stats(self):
+        """Метрики буфера відкладеного запису."""
+        return {
+            "pending": self._count,
+            "flushes": self._flushes,
+            "flushed_rows": self._flushed_rows,
+            "dropped_rows": self._dropped_rows,
+            "dead_rows": self._dead_rows,
+            "last_flush_ms": self._last_flush_ms
+        }
+
+    def stop(self):
+        """Зупинка потоку зі скиданням залишку буфера."""
+        thread = self._thread
+        if not thread:
+            return
+        self._stopping = True
+        self._notify()
+        thread.join()
+        self._thread = None
+
+write_buffer = WriteBehindBuffer(engine)
+response_cache = LRUCache(max_entries=CACHE_MAX_ENTRIES)
+_cache_counters = {"db_hits": 0, "db_misses": 0, "db_swept": 0}
+_sweeper_task = None
+# Скрипти (encrypt_keys, check_encoding) не викликають close_db, тому буфер скидається і при виході з інтерпретатора
+atexit.register(write_buffer.stop)
+
+def get_pool_stats():
+    """Метрики пулу з'єднань для дашборду."""
+    return {**engine.stats(), "write_behind": write_buffer.stats()}
+
+async def close_db():
+    """Скидання буфера запису і закриття пулу з'єднань при завершенні роботи."""
+    global _sweeper_task
+    if _sweeper_task:
+        _sweeper_task.cancel()
+        _sweeper_task = None
+    await asyncio.get_running_loop().run_in_executor(None, write_buffer.stop)
+    await write_buffer.flush()
+    await engine.close()
+
+MIGRATIONS = [
+    (1, "hot_query_indexes", [
+        "CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_history_user_timestamp ON history (user_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_trades_user_testnet_timestamp ON trades (user_id, is_testnet, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_suspicious_processes_timestamp ON suspicious_processes (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_upgrades_timestamp ON upgrades (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_upgrades_user_timestamp ON upgrades (user_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_instructions_timestamp ON instructions (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_cache_timestamp ON cache (timestamp)"
+    ]),
+    (2, "cache_expires_at", {
+        "sqlite": [
+            "ALTER TABLE cache ADD COLUMN expires_at DATETIME",
+            "CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache (expires_at)"
+        ],
+        "postgresql": [
+            "ALTER TABLE cache ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP",
+            "CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache (expires_at)"
+        ]
+    }),
+    (3, "semantic_cache", {
+        "sqlite": [
+            "CREATE TABLE IF NOT EXISTS semantic_cache (query_hash TEXT PRIMARY KEY, user_id TEXT, model TEXT, "
+            "embedding BLOB, saved_ms REAL, expires_at DATETIME)",
+            "CREATE INDEX IF NOT EXISTS idx_semantic_cache_expires_at ON semantic_cache (expires_at)"
+        ],
+        "postgresql": [
+            "CREATE TABLE IF NOT EXISTS semantic_cache (query_hash TEXT PRIMARY KEY, user_id TEXT, model TEXT, "
+            "embedding BYTEA, saved_ms REAL, expires_at TIMESTAMP)",
+            "CREATE INDEX IF NOT EXISTS idx_semantic_cache_expires_at ON semantic_cache (expires_at)"
+        ]
+    })
+]
+
+def _migration_statements(statements):
+    """Спільний список SQL або словник {тип БД: список}."""
+    if isinstance(statements, dict):
+        return statements["postgresql" if DB_TYPE == "postgresql" else "sqlite"]
+    return statements
+
+async def apply_migrations():
+    """Застосування нових версій схеми (ідемпотентно, при кожному запуску)."""
+    if DB_TYPE == "postgresql":
+        async with engine.acquire() as conn:
+            async with conn.transaction():
+                # Блокування на час транзакції, щоб кілька процесів не мігрували одночасно
+                await conn.execute("SELECT pg_advisory_xact_lock(725001)")
+                await conn.execute(
+                    "CREATE TABLE IF NOT EXISTS schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+                )
+                applied = {row['version'] for row in await conn.fetch("SELECT version FROM schema_migrations")}
+                for version, name, statements in MIGRATIONS:
+                    if version in applied:
+                        continue
+                    for statement in _migration_statements(statements):
+                        await conn.execute(statement)
+                    await conn.execute("INSERT INTO schema_migrations (version, name) VALUES ($1, $2)", version, name)
+                    logger.info(f"Міграцію {version} ({name}) застосовано")
+    else:
+        def migrate(conn):
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+            )
+            applied = {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+            done = []
+            for version, name, statements in MIGRATIONS:
+                if version in applied:
+                    continue
+                for statement in _migration_statements(statements):
+                    conn.execute(statement)
+                conn.execute("INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (version, name))
+                done.append((version, name))
+            return done
+        for version, name in await engine.sqlite.write(migrate):
+            logger.info(f"Міграцію {version} ({name}) застосовано")
+
+async def init_db():
+    """Ініціалізація бази даних."""
+    global _sweeper_task
+    try:
+        await engine.start()
+        if DB_TYPE == "postgresql":
+            await engine.executescript('''
+                CREATE TABLE IF NOT EXISTS history (
+                    id SERIAL PRIMARY KEY,
+                    user_id TEXT,
+                    query TEXT,
+                    response TEXT,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE TABLE IF NOT EXISTS context (
+                    user_id TEXT PRIMARY KEY,
+                    context_data TEXT
+                );
+                CREATE TABLE IF NOT EXISTS cache (
+                    query_hash TEXT PRIMARY KEY,
+                    response TEXT,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE TABLE IF NOT EXISTS suspicious_processes (
+                    id SERIAL PRIMARY KEY,
+                    process_name TEXT,
+                    cpu_percent REAL,
+                    memory_percent REAL,
+                    path TEXT,
+                    status TEXT,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE TABLE IF NOT EXISTS trades (
+                    id SERIAL PRIMARY KEY,
+                    user_id TEXT,
+                    symbol TEXT,
+                    side TEXT,
+                    quantity REAL,
+                    price REAL,
+                    status TEXT,
+                    is_testnet BOOLEAN,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE TABLE IF NOT EXISTS upgrades (
+                    id SERIAL PRIMARY KEY,
+                    user_id TEXT,
+                    upgrade_request TEXT,
+                    status TEXT,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE TABLE IF NOT EXISTS instructions (
+                    id SERIAL PRIMARY KEY,
+                    query TEXT,
+                    response TEXT,
+                    source TEXT,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+            ''')
+        else:
+            await engine.executescript('''
+                CREATE TABLE IF NOT EXISTS history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT,
+                    query TEXT,
+                    response TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE TABLE IF NOT EXISTS context (
+                    user_id TEXT PRIMARY KEY,
+                    context_data TEXT
+                );
+                CREATE TABLE IF NOT EXISTS cache (
+                    query_hash TEXT PRIMARY KEY,
+                    response TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE TABLE IF NOT EXISTS suspicious_processes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    process_name TEXT,
+                    cpu_percent REAL,
+                    memory_percent REAL,
+                    path TEXT,
+                    status TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE TABLE IF NOT EXISTS trades (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT,
+                    symbol TEXT,
+                    side TEXT,
+                    quantity REAL,
+                    price REAL,
+                    status TEXT,
+                    is_testnet BOOLEAN,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE TABLE IF NOT EXISTS upgrades (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT,
+                    upgrade_request TEXT,
+                    status TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE TABLE IF NOT EXISTS instructions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    query TEXT,
+                    response TEXT,
+                    source TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                );
+            ''')
+        await apply_migrations()
+        if _sweeper_task is None:
+            _sweeper_task = asyncio.create_task(_cache_sweeper())
+        logger.info("База даних ініціалізована")
+    except Exception as e:
+        logger.error(f"Помилка ініціалізації бази даних: {str(e)}")
+        from plugins.self_improvement import handle_error
+        await handle_error(str(e))
+
+async def save_interaction(user_id, query, response, sync=False):
+    """Збереження взаємодії в базі даних."""
+    try:
+        encrypted_response = await encrypt_data(response, user_id)
+        await write_buffer.add("history", (user_id, query, encrypted_response), sync=sync)
+        logger.info(f"Взаємодія збережена для user_id: {user_id}")
+    except Exception as e:
+        logger.error(f"Помилка збереження взаємодії: {str(e)}")
+        if sync:
+            raise
+
+async def get_context(user_id):
+    """Отримання контексту користувача."""
+    try:
+        if DB_TYPE == "postgresql":
+            result = await engine.fetchrow("SELECT context_data FROM context WHERE user_id = $1", user_id)
+        else:
+            result = await engine.fetchrow("SELECT context_data FROM context WHERE user_id = ?", user_id)
+        if result:
+            return await decrypt_data(result[0], user_id=user_id)
+        return ""
+    except Exception as e:
+        logger.error(f"Помилка отримання контексту: {str(e)}")
+        return ""
+
+async def save_context(user_id, context_data):
+    """Збереження контексту користувача."""
+    try:
+        encrypted_context = await encrypt_data(context_data, user_id)
+        if DB_TYPE == "postgresql":
+            await engine.execute(
+                "INSERT INTO context (user_id, context_data) VALUES ($1, $2) ON CONFLICT (user_id) DO UPDATE SET context_data = $2",
+                user_id, encrypted_context
+            )
+        else:
+            await engine.execute(
+                "INSERT OR REPLACE INTO context (user_id, context_data) VALUES (?, ?)",
+                user_id, encrypted_context
+            )
+        logger.info(f"Контекст збережено для user_id: {user_id}")
+    except Exception as e:
+        logger.error(f"Помилка збереження контексту: {str(e)}")
+
+async def get_cached_response(query_hash):
+    """Отримання кешованої відповіді (спершу з пам'яті, потім з таблиці cache)."""
+    cached = response_cache.get(query_hash)
+    if cached is not None:
+        return cached
+    try:
+        if DB_TYPE == "postgresql":
+            result = await engine.fetchrow(
+                "SELECT response, EXTRACT(EPOCH FROM expires_at - CURRENT_TIMESTAMP) FROM cache "
+                "WHERE query_hash = $1 AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP)",
+                query_hash
+            )
+        else:
+            result = await engine.fetchrow(
+                "SELECT response, (julianday(expires_at) - julianday('now')) * 86400 FROM cache "
+                "WHERE query_hash = ? AND (expires_at IS NULL OR expires_at > datetime('now'))",
+                query_hash
+            )
+        if result:
+            _cache_counters["db_hits"] += 1
+            response = await decrypt_data(result[0])
+            remaining = ttl_for(query_hash) if result[1] is None else min(float(result[1]), ttl_for(query_hash))
+            response_cache.set(query_hash, response, ttl=remaining)
+            return response
+        _cache_counters["db_misses"] += 1
+        return None
+    except Exception as e:
+        logger.error(f"Помилка отримання кешованої відповіді: {str(e)}")
+        return None
+
+async def save_cached_response(query_hash, response, ttl=None):
+    """Збереження кешованої відповіді з TTL за префіксом ключа."""
+    ttl = ttl_for(query_hash) if ttl is None else ttl
+    response_cache.set(query_hash, response, ttl=ttl)
+    try:
+        encrypted_response = await encrypt_data(response)
+        if DB_TYPE == "postgresql":
+            await engine.execute(
+                "INSERT INTO cache (query_hash, response, timestamp, expires_at) "
+                "VALUES ($1, $2, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP + $3 * INTERVAL '1 second') "
+                "ON CONFLICT (query_hash) DO UPDATE SET response = $2, timestamp = EXCLUDED.timestamp, expires_at = EXCLUDED.expires_at",
+                query_hash, encrypted_response, float(ttl)
+            )
+        else:
+            await engine.execute(
+                "INSERT OR REPLACE INTO cache (query_hash, response, expires_at) VALUES (?, ?, datetime('now', ?))",
+                query_hash, encrypted_response, f"+{int(ttl)} seconds"
+            )
+        logger.info(f"Кешована відповідь збережена для: {query_hash}")
+    except Exception as e:
+        logger.error(f"Помилка збереження кешованої відповіді: {str(e)}")
+
+async def sweep_cache(max_rows=CACHE_DB_MAX_ROWS):
+    """Видалення прострочених записів і найстаріших рядків понад ліміт таблиці cache."""
+    response_cache.purge_expired()
+    if DB_TYPE == "postgresql":
+        await engine.execute("DELETE FROM semantic_cache WHERE expires_at <= CURRENT_TIMESTAMP")
+        expired = await engine.execute("DELETE FROM cache WHERE expires_at <= CURRENT_TIMESTAMP")
+        trimmed = await engine.execute(
+            "DELETE FROM cache WHERE query_hash IN (SELECT query_hash FROM cache ORDER BY timestamp DESC OFFSET $1)",
+            max_rows
+        )
+        removed = int(expired.split()[-1]) + int(trimmed.split()[-1])
+    else:
+        await engine.execute("DELETE FROM semantic_cache WHERE expires_at <= datetime('now')")
+        expired = await engine.execute("DELETE FROM cache WHERE expires_at <= datetime('now')")
+        trimmed = await engine.execute(
+            "DELETE FROM cache WHERE query_hash IN (SELECT query_hash FROM cache ORDER BY timestamp DESC LIMIT -1 OFFSET ?)",
+            max_rows
+        )
+        removed = expired + trimmed
+    _cache_counters["db_swept"] += removed
+    return removed
+
+async def _cache_sweeper(interval=CACHE_SWEEP_INTERVAL):
+    """Фонове очищення таблиці cache."""
+    while True:
+        try:
+            removed = await sweep_cache()
+            if removed:
+                logger.info(f"Очищено кеш: видалено {removed} записів")
+        except Exception as e:
+            logger.error(f"Помилка очищення кешу: {str(e)}")
+        await asyncio.sleep(interval)
+
+async def save_semantic_entry(query_hash, user_id, model, embedding, saved_ms, ttl):
+    """Збереження вектора семантичного кешу (відповідь лежить у таблиці cache під тим самим ключем)."""
+    try:
+        if DB_TYPE == "postgresql":
+            await engine.execute(
+                "INSERT INTO semantic_cache (query_hash, user_id, model, embedding, saved_ms, expires_at) "
+                "VALUES ($1, $2, $3, $4, $5, CURRENT_TIMESTAMP + $6 * INTERVAL '1 second') "
+                "ON CONFLICT (query_hash) DO UPDATE SET model = $3, embedding = $4, saved_ms = $5, expires_at = EXCLUDED.expires_at",
+                query_hash, user_id, model, embedding, saved_ms, float(ttl)
+            )
+        else:
+            await engine.execute(
+                "INSERT OR REPLACE INTO semantic_cache (query_hash, user_id, model, embedding, saved_ms, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, datetime('now', ?))",
+                query_hash, user_id, model, embedding, saved_ms, f"+{int(ttl)} seconds"
+            )
+    except Exception as e:
+        logger.error(f"Помилка збереження семантичного кешу: {str(e)}")
+
+async def get_semantic_entries(model):
+    """Непрострочені вектори семантичного кешу для моделі ембедінгів (з рештою TTL у секундах)."""
+    try:
+        if DB_TYPE == "postgresql":
+            return await engine.fetch(
+                "SELECT query_hash, user_id, embedding, saved_ms, EXTRACT(EPOCH FROM expires_at - CURRENT_TIMESTAMP) "
+                "FROM semantic_cache WHERE model = $1 AND expires_at > CURRENT_TIMESTAMP",
+                model
+            )
+        return await engine.fetch(
+            "SELECT query_hash, user_id, embedding, saved_ms, (julianday(expires_at) - julianday('now')) * 86400 "
+            "FROM semantic_cache WHERE model = ? AND expires_at > datetime('now')",
+            model
+        )
+    except Exception as e:
+        logger.error(f"Помилка завантаження семантичного кешу: {str(e)}")
+        return []
+
+async def delete_semantic_entry(query_hash):
+    """Видалення вектора, відповідь якого вже зникла з кешу."""
+    try:
+        if DB_TYPE == "postgresql":
+            await engine.execute("DELETE FROM semantic_cache WHERE query_hash = $1", query_hash)
+        else:
+            await engine.execute("DELETE FROM semantic_cache WHERE query_hash = ?", query_hash)
+    except Exception as e:
+        logger.error(f"Помилка видалення з семантичного кешу: {str(e)}")
+
+def get_cache_stats():
+    """Лічильники влучань, промахів і витіснень кешу."""
+    return {"memory": response_cache.stats(), "database": dict(_cache_counters), "single_flight": single_flight.stats()}
+
+async def save_suspicious_process(process_info, sync=False):
+    """Збереження інформації про підозрілий процес."""
+    try:
+        await write_buffer.add(
+            "suspicious_processes",
+            (process_info['name'], process_info['cpu_percent'], process_info['memory_percent'], process_info['path'], process_info['status']),
+            sync=sync
+        )
+        logger.info(f"Підозрілий процес збережено: {process_info['name']}")
+    except Exception as e:
+        logger.error(f"Помилка збереження підозрілого процесу: {str(e)}")
+        if sync:
+            raise
+
+async def save_trade(trade_info, sync=False):
+    """Збереження торговельної угоди."""
+    try:
+        await write_buffer.add(
+            "trades",
+            (trade_info['user_id'], trade_info['symbol'], trade_info['side'], trade_info['quantity'],
+             trade_info['price'], trade_info['status'], trade_info['is_testnet']),
+            sync=sync
+        )
+        logger.info(f"Угода збережена: {trade_info['symbol']}")
+    except Exception as e:
+        logger.error(f"Помилка збереження угоди: {str(e)}")
+        if sync:
+            raise
+
+async def save_upgrade(user_id, upgrade_request, source, status, sync=False):
+    """Збереження запиту на оновлення."""
+    try:
+        await write_buffer.add("upgrades", (user_id, upgrade_request, status), sync=sync)
+        logger.info(f"Оновлення збережено для user_id: {user_id}, джерело: {source}")
+    except Exception as e:
+        logger.error(f"Помилка збереження оновлення: {str(e)}")
+        if sync:
+            raise
+
+async def save_instruction(query, response, source, sync=False):
+    """Збереження інструкції."""
+    try:
+        encrypted_response = await encrypt_data(response)
+        await write_buffer.add("instructions", (query, encrypted_response, source), sync=sync)
+        logger.info(f"Інструкція збережена для запиту: {query}")
+    except Exception as e:
+        logger.error(f"Помилка збереження інструкції: {str(e)}")
+        if sync:
+            raise
+
+async def get_trades(user_id, testnet=True, limit=100):
+    """Останні угоди користувача (symbol, side, quantity, price, status)."""
+    try:
+        if DB_TYPE == "postgresql":
+            rows = await engine.fetch(
+                "SELECT symbol, side, quantity, price, status FROM trades WHERE user_id = $1 AND is_testnet = $2 ORDER BY timestamp DESC LIMIT $3",
+                user_id, testnet, limit
+            )
+        else:
+            rows = await engine.fetch(
+                "SELECT symbol, side, quantity, price, status FROM trades WHERE user_id = ? AND is_testnet = ? ORDER BY timestamp DESC LIMIT ?",
+                user_id, testnet, limit
+            )
+        return [tuple(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Помилка отримання угод: {str(e)}")
+        return []
+
+async def get_dashboard_data(limit=10):
+    """Останні записи для веб-дашборду."""
+    placeholder = "$1" if DB_TYPE == "postgresql" else "?"
+    history = await engine.fetch(f"SELECT user_id, query, response, timestamp FROM history ORDER BY timestamp DESC LIMIT {placeholder}", limit)
+    suspicious = await engine.fetch(f"SELECT process_name, cpu_percent, memory_percent, path, status, timestamp FROM suspicious_processes ORDER BY timestamp DESC LIMIT {placeholder}", limit)
+    trades = await engine.fetch(f"SELECT user_id, symbol, side, quantity, price, status, is_testnet, timestamp FROM trades ORDER BY timestamp DESC LIMIT {placeholder}", limit)
+    upgrades = await engine.fetch(f"SELECT user_id, upgrade_request, status, timestamp FROM upgrades ORDER BY timestamp DESC LIMIT {placeholder}", limit)
+    responses = await decrypt_batch(row[2] for row in history)
+    return {
+        "history": [(row[0], row[1], response, row[3]) for row, response in zip(history, responses)],
+        "suspicious": [tuple(row) for row in suspicious],
+        "trades": [tuple(row) for row in trades],
+        "upgrades": [tuple(row) for row in upgrades]
+    }
\ No newline at end of file
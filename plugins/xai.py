@@ -1,48 +1,112 @@
-﻿import httpx
-import asyncio
-import logging
-import os
-from config import BASE_DIR, XAI_API_KEY, ENCRYPTION_KEY
-from security import decrypt_data
-from database import save_cached_response, get_cached_response, save_interaction
-from utils.notify_user import notify_user
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
-
-async def request_xai(prompt, mode="default"):
-    """Запит до xAI API."""
-    cached_key = f"xai_{prompt}_{mode}"
-    cached = await get_cached_response(cached_key)
-    if cached:
-        return cached
-    try:
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "Authorization": f"Bearer {decrypt_data(XAI_API_KEY, ENCRYPTION_KEY)}",
-                "Content-Type": "application/json"
-            }
-            data = {
-                "prompt": prompt,
-                "max_tokens": 500,
-                "mode": mode  # default, deepsearch, voice
-            }
-            response = await client.post("https://api.x.ai/v1/completions", headers=headers, json=data, timeout=30)
-            if response.status_code == 200:
-                result = response.json().get("choices")[0].get("text")
-                await save_cached_response(cached_key, result)
-                await save_interaction("system", f"xAI request: {prompt}", result)
-                return result
-            return None
-    except Exception as e:
-        logger.error(f"xAI request error: {str(e)}")
-        from self_improvement import handle_error
-        await handle_error(str(e))
-        return None
\ No newline at end of file
+﻿import asyncio
+import json
+import logging
+import os
+from config import BASE_DIR
+from security import vault
+from database import save_cached_response, get_cached_response, save_interaction
+from utils.notify_user import notify_user
+from utils.cache import single_flight
+from utils.http_client import http_clients
+from utils.circuit_breaker import breakers, CircuitOpenError
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+async def request_xai(prompt, mode="default"):
+    """Запит до xAI API."""
+    cached_key = f"xai_{prompt}_{mode}"
+    cached = await get_cached_response(cached_key)
+    if cached:
+        return cached
+    return await single_flight.do(cached_key, _request_xai, cached_key, prompt, mode)
+
+async def _request_xai(cached_key, prompt, mode):
+    """HTTP-запит до xAI (одне обчислення на ключ кешу)."""
+    try:
+        client = http_clients.get("xai")
+        headers = {
+            "Authorization": f"Bearer {vault.get('XAI_API_KEY')}",
+            "Content-Type": "application/json"
+        }
+        data = {
+            "prompt": prompt,
+            "max_tokens": 500,
+            "mode": mode  # default, deepsearch, voice
+        }
+        response = await breakers.get("xai").call(client.post, "https://api.x.ai/v1/completions", headers=headers, json=data)
+        if response.status_code == 200:
+            result = response.json().get("choices")[0].get("text")
+            await save_cached_response(cached_key, result)
+            await save_interaction("system", f"xAI request: {prompt}", result)
+            return result
+        return None
+    except (CircuitOpenError, asyncio.TimeoutError):
+        # Недоступний провайдер — не помилка коду, handle_error не потрібен
+        logger.warning("xAI недоступний (вимикач розімкнено або тайм-аут)")
+        return None
+    except Exception as e:
+        logger.error(f"xAI request error: {str(e)}")
+        from plugins.self_improvement import handle_error
+        await handle_error(str(e))
+        return None
+
+async def stream_xai(prompt, mode="default"):
+    """Потоковий запит до xAI: видає фрагменти тексту по мірі генерації."""
+    cached_key = f"xai_{prompt}_{mode}"
+    cached = await get_cached_response(cached_key)
+    if cached:
+        yield cached
+        return
+    breaker = breakers.get("xai")
+    if not breaker.allow():
+        return
+    parts = []
+    recorded = False
+    try:
+        headers = {
+            "Authorization": f"Bearer {vault.get('XAI_API_KEY')}",
+            "Content-Type": "application/json"
+        }
+        data = {
+            "prompt": prompt,
+            "max_tokens": 500,
+            "mode": mode,
+            "stream": True
+        }
+        async with http_clients.get("xai").stream("POST", "https://api.x.ai/v1/completions", headers=headers, json=data,
+                                                  timeout=breaker.timeout()) as response:
+            # Затримка потоку — лише до заголовків, тому в адаптивний тайм-аут не йде
+            breaker.record_result(response)
+            recorded = True
+            if response.status_code != 200:
+                return
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                payload = line[len("data: "):]
+                if payload.strip() == "[DONE]":
+                    break
+                text = json.loads(payload).get("choices")[0].get("text")
+                if text:
+                    parts.append(text)
+                    yield text
+    except Exception as e:
+        if not recorded:
+            breaker.record_failure()
+        logger.error(f"xAI stream error: {str(e)}")
+        return
+    finally:
+        if not recorded:
+            breaker.release()
+    if parts:
+        result = "".join(parts)
+        await save_cached_response(cached_key, result)
+        await save_interaction("system", f"xAI request: {prompt}", result)
\ No newline at end of file
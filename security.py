@@ -1,45 +1,200 @@
-﻿from cryptography.fernet import Fernet
-import logging
-import os
-from config import BASE_DIR, ENCRYPTION_KEY
-from utils.notify_user import notify_user
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
-
-async def encrypt_data(data, user_id="system"):
-    """Шифрування даних."""
-    try:
-        f = Fernet(ENCRYPTION_KEY)
-        if isinstance(data, str):
-            data = data.encode()
-        encrypted = f.encrypt(data)
-        result = encrypted.decode()
-        await notify_user(user_id, f"Дані зашифровано для user_id: {user_id}")
-        return result
-    except Exception as e:
-        logger.error(f"Помилка шифрування: {str(e)}")
-        await notify_user(user_id, f"Помилка шифрування: {str(e)}")
-        return data
-
-async def decrypt_data(data, key=None, user_id="system"):
-    """Дешифрування даних."""
-    try:
-        f = Fernet(key or ENCRYPTION_KEY)
-        if isinstance(data, str):
-            data = data.encode()
-        decrypted = f.decrypt(data)
-        result = decrypted.decode()
-        await notify_user(user_id, f"Дані розшифровано для user_id: {user_id}")
-        return result
-    except Exception as e:
-        logger.error(f"Помилка дешифрування: {str(e)}")
-        await notify_user(user_id, f"Помилка дешифрування: {str(e)}")
-        return data
\ No newline at end of file
+﻿from cryptography.fernet import Fernet
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from dotenv import dotenv_values
+from config import CONFIG, BASE_DIR, ENCRYPTION_KEY
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+class CryptoService:
+    """Шифрування Fernet з кешованими екземплярами шифру та лічильниками аудиту в пам'яті."""
+
+    # Пакети, більші за цей розмір, шифруються в пулі потоків, щоб не блокувати event loop
+    OFFLOAD_THRESHOLD = 256
+
+    def __init__(self, key=ENCRYPTION_KEY):
+        self.default_key = key
+        self._ciphers = {}
+        self._lock = threading.Lock()
+        self.counters = defaultdict(int)
+        self.per_user = defaultdict(lambda: defaultdict(int))
+
+    def cipher(self, key=None):
+        """Fernet для ключа, створений один раз."""
+        key = key or self.default_key
+        f = self._ciphers.get(key)
+        if f is None:
+            with self._lock:
+                f = self._ciphers.get(key)
+                if f is None:
+                    f = Fernet(key)
+                    self._ciphers[key] = f
+        return f
+
+    def _audit(self, event, user_id, count=1):
+        with self._lock:
+            self.counters[event] += count
+            self.per_user[user_id][event] += count
+
+    def encrypt(self, data, user_id="system"):
+        """Синхронне шифрування одного значення."""
+        try:
+            if isinstance(data, str):
+                data = data.encode()
+            result = self.cipher().encrypt(data).decode()
+            self._audit("encrypted", user_id)
+            return result
+        except Exception as e:
+            logger.error(f"Помилка шифрування: {str(e)}")
+            self._audit("encrypt_errors", user_id)
+            return data
+
+    def decrypt(self, data, key=None, user_id="system"):
+        """Синхронне дешифрування одного значення."""
+        try:
+            if isinstance(data, str):
+                data = data.encode()
+            result = self.cipher(key).decrypt(data).decode()
+            self._audit("decrypted", user_id)
+            return result
+        except Exception as e:
+            logger.error(f"Помилка дешифрування: {str(e)}")
+            self._audit("decrypt_errors", user_id)
+            return data
+
+    def encrypt_many(self, items, user_id="system"):
+        return [self.encrypt(item, user_id) for item in items]
+
+    def decrypt_many(self, items, key=None, user_id="system"):
+        return [self.decrypt(item, key, user_id) for item in items]
+
+    def stats(self):
+        """Лічильники аудиту шифрування."""
+        with self._lock:
+            return {
+                "totals": dict(self.counters),
+                "users": {user_id: dict(events) for user_id, events in self.per_user.items()},
+                "cached_ciphers": len(self._ciphers)
+            }
+
+crypto = CryptoService()
+
+async def encrypt_data(data, user_id="system"):
+    """Шифрування даних."""
+    return crypto.encrypt(data, user_id)
+
+async def decrypt_data(data, key=None, user_id="system"):
+    """Дешифрування даних."""
+    return crypto.decrypt(data, key, user_id)
+
+async def encrypt_batch(items, user_id="system"):
+    """Шифрування набору значень (наприклад, рядків з бази)."""
+    items = list(items)
+    if len(items) > crypto.OFFLOAD_THRESHOLD:
+        return await asyncio.to_thread(crypto.encrypt_many, items, user_id)
+    return crypto.encrypt_many(items, user_id)
+
+async def decrypt_batch(items, key=None, user_id="system"):
+    """Дешифрування набору значень (наприклад, рядків з бази)."""
+    items = list(items)
+    if len(items) > crypto.OFFLOAD_THRESHOLD:
+        return await asyncio.to_thread(crypto.decrypt_many, items, key, user_id)
+    return crypto.decrypt_many(items, key, user_id)
+
+def get_audit_stats():
+    """Лічильники аудиту замість сповіщень на кожен виклик."""
+    return crypto.stats()
+
+SECRET_NAMES = (
+    "TELEGRAM_TOKEN", "GITHUB_TOKEN", "XAI_API_KEY", "OPENAI_API_KEY", "LLAMA_API_KEY",
+    "GOOGLE_API_KEY", "YOUTUBE_API_KEY", "BINANCE_API_KEY", "BINANCE_API_SECRET",
+    "BINANCE_TESTNET_API_KEY", "BINANCE_TESTNET_API_SECRET"
+)
+
+class SecretVault:
+    """Сховище облікових даних: ключі розшифровуються один раз і видаються синхронно.
+
+    Значення з .env можуть бути зашифровані (encrypt_keys.py) або відкриті.
+    При зміні .env сховище перечитує файл без перезапуску.
+    """
+
+    __slots__ = ("_secrets", "_lock", "_env_path", "_env_mtime", "_last_check", "_check_interval", "_loaded", "reloads")
+
+    def __init__(self, env_path=os.path.join(BASE_DIR, ".env"), check_interval=5.0):
+        self._secrets = {}
+        self._lock = threading.Lock()
+        self._env_path = env_path
+        self._env_mtime = None
+        self._last_check = 0.0
+        self._check_interval = check_interval
+        self._loaded = False
+        self.reloads = 0
+
+    def _env_file_mtime(self):
+        try:
+            return os.stat(self._env_path).st_mtime
+        except OSError:
+            return None
+
+    def _decrypt(self, value):
+        if not value:
+            return value
+        try:
+            return crypto.cipher().decrypt(value.encode()).decode()
+        except Exception:
+            # Ключ зберігається у відкритому вигляді
+            return value
+
+    def load(self):
+        """Розшифрування всіх ключів з CONFIG і .env."""
+        mtime = self._env_file_mtime()
+        values = {name: getattr(CONFIG, name, None) for name in SECRET_NAMES}
+        if mtime is not None:
+            env_values = dotenv_values(self._env_path)
+            values.update({name: env_values[name] for name in SECRET_NAMES if env_values.get(name)})
+        secrets = {name: self._decrypt(value) for name, value in values.items()}
+        with self._lock:
+            if self._loaded:
+                self.reloads += 1
+            self._secrets = secrets
+            self._env_mtime = mtime
+            self._last_check = time.monotonic()
+            self._loaded = True
+        logger.info(f"Сховище ключів завантажено: {sum(1 for v in secrets.values() if v)} ключів")
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < self._check_interval:
+            return
+        self._last_check = now
+        if self._env_file_mtime() != self._env_mtime:
+            logger.info(".env змінено, перечитую ключі")
+            self.load()
+
+    def get(self, name, default=None):
+        """Розшифрований ключ (завантаження при першому зверненні)."""
+        if not self._loaded:
+            self.load()
+        else:
+            self._maybe_reload()
+        return self._secrets.get(name) or default
+
+    def __repr__(self):
+        return f"<SecretVault: {sum(1 for v in self._secrets.values() if v)} ключів>"
+
+    def __reduce__(self):
+        raise TypeError("SecretVault не можна серіалізувати")
+
+vault = SecretVault()
\ No newline at end of file
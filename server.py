@@ -1,99 +1,202 @@
-﻿from fastapi import FastAPI, WebSocket, Request
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-import sqlite3
-import os
-import asyncio
-from config import BASE_DIR, DB_PATH
-from system_manager import get_system_info, start_program, kill_process
-from home_control import scan_system
-from crypto_trader import analyze_market, execute_trade, get_open_positions, analyze_user_trades, handle_testnet_results
-from cloud_manager import check_cloud_status
-from plugins.file_reader import read_file
-from plugins.youtube import play_youtube
-from plugins.search import search_query
-from plugins.zhanna import request_zhanna_upgrade
-from database import save_interaction, get_context
-from audio_manager import recognize_speech, speak
-from plugins.self_learning import learn_response
-from utils.network import is_online
-from main import process_command
-from tts import router as tts_router
-
-app = FastAPI()
-app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
-templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
-app.include_router(tts_router, prefix="/tts")
-
-def init_web_server(model):
-    @app.get("/", response_class=HTMLResponse)
-    async def dashboard(request: Request):
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            c.execute("SELECT user_id, query, response, timestamp FROM history ORDER BY timestamp DESC LIMIT 10")
-            history = c.fetchall()
-            c.execute("SELECT process_name, cpu_percent, memory_percent, path, status, timestamp FROM suspicious_processes ORDER BY timestamp DESC LIMIT 10")
-            suspicious = c.fetchall()
-            c.execute("SELECT user_id, symbol, side, quantity, price, status, is_testnet, timestamp FROM trades ORDER BY timestamp DESC LIMIT 10")
-            trades = c.fetchall()
-            c.execute("SELECT user_id, upgrade_request, status, timestamp FROM upgrades ORDER BY timestamp DESC LIMIT 10")
-            upgrades = c.fetchall()
-            conn.close()
-            online_status = await is_online()
-            market_data = await analyze_market(None, "web_user", testnet=True)
-            return templates.TemplateResponse("dashboard.html", {
-                "request": request,
-                "history": history,
-                "suspicious": suspicious,
-                "trades": trades,
-                "upgrades": upgrades,
-                "online_status": online_status,
-                "market_data": market_data[:1000]  # Обмеження для відображення
-            })
-        except Exception as e:
-            logger.error(f"Dashboard error: {str(e)}")
-            return HTMLResponse(f"Помилка: {str(e)}", status_code=500)
-
-    @app.get("/api/market-data")
-    async def market_data(symbol: str = "ALL"):
-        try:
-            data = await analyze_market(symbol if symbol != "ALL" else None, "web_user", testnet=True)
-            # Форматування для Chart.js
-            return {
-                "labels": [f"Time {i}" for i in range(10)],  # Placeholder
-                "symbols": [{"name": symbol or "ALL", "prices": [float(d.split("Ціна: ")[1].split(" ")[0]) for d in data.split("\n") if "Ціна: " in d][:10]}]
-            }
-        except Exception as e:
-            logger.error(f"Market data API error: {str(e)}")
-            return {"error": str(e)}
-
-    @app.websocket("/ws")
-    async def websocket_endpoint(websocket: WebSocket):
-        await websocket.accept()
-        user_id = "web_user"
-        while True:
-            try:
-                data = await websocket.receive_json()
-                command = data.get("command")
-                if command == "voice":
-                    text = await recognize_speech()
-                    response = await process_command(text, user_id, model)
-                elif command == "upgrade":
-                    response = await request_zhanna_upgrade(user_id, command) if await is_online() else "Немає інтернету"
-                elif command:
-                    response = await process_command(command, user_id, model)
-                else:
-                    response = "Невідома команда"
-                await learn_response(command, response)
-                await websocket.send_json({"response": response, "type": "text"})
-                await speak(response, user_id)
-            except Exception as e:
-                logger.error(f"WebSocket error: {str(e)}")
-                from plugins.self_improvement import handle_error
-                await handle_error(str(e))
-                await websocket.send_json({"error": str(e)})
-                break
-
+﻿from fastapi import FastAPI, WebSocket, Request
+from fastapi.responses import HTMLResponse
+from fastapi.staticfiles import StaticFiles
+from fastapi.templating import Jinja2Templates
+import os
+import asyncio
+from contextlib import aclosing
+from config import BASE_DIR
+from system_manager import get_system_info, start_program, kill_process
+from home_control import scan_system
+from crypto_trader import analyze_market, execute_trade, get_open_positions, analyze_user_trades, handle_testnet_results
+from cloud_manager import check_cloud_status
+from plugins.file_reader import read_file
+from plugins.youtube import play_youtube
+from plugins.search import search_query
+from plugins.zhanna import request_zhanna_upgrade
+from database import save_interaction, get_context, get_pool_stats, get_cache_stats, get_dashboard_data
+from audio_manager import recognize_speech, speak
+from plugins.self_learning import learn_response
+from utils.network import is_online, monitor
+from utils.http_client import http_clients
+from utils.notify_user import notifier, websocket_sink
+from utils.inference import inference
+from utils.models import models
+from utils.fanout import provider_race
+from utils.circuit_breaker import breakers
+from utils.semantic_cache import semantic_cache
+from utils.context import conversations
+from utils.intents import router_stats
+from utils.scan import scan_engine
+from utils.exchange import exchange_sessions
+from utils.market_feed import market_feed
+from utils.indicators import indicators
+from utils.streaming import WebSocketStream, stream_stats
+from main import process_command
+from security import get_audit_stats
+from tts import router as tts_router
+
+app = FastAPI()
+app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
+templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
+app.include_router(tts_router, prefix="/tts")
+
+def init_web_server(model=None):
+    if model is None:
+        model = models.acquire()
+
+    @app.get("/", response_class=HTMLResponse)
+    async def dashboard(request: Request):
+        try:
+            data = await get_dashboard_data(limit=10)
+            online_status = await is_online()
+            market_data = await analyze_market(None, "web_user", testnet=True)
+            return templates.TemplateResponse("dashboard.html", {
+                "request": request,
+                "history": data["history"],
+                "suspicious": data["suspicious"],
+                "trades": data["trades"],
+                "upgrades": data["upgrades"],
+                "online_status": online_status,
+                "market_data": market_data[:1000]  # Обмеження для відображення
+            })
+        except Exception as e:
+            logger.error(f"Dashboard error: {str(e)}")
+            return HTMLResponse(f"Помилка: {str(e)}", status_code=500)
+
+    @app.get("/api/market-data")
+    async def market_data(symbol: str = "ALL"):
+        try:
+            data = await analyze_market(symbol if symbol != "ALL" else None, "web_user", testnet=True)
+            # Форматування для Chart.js
+            return {
+                "labels": [f"Time {i}" for i in range(10)],  # Placeholder
+                "symbols": [{"name": symbol or "ALL", "prices": [float(d.split("Ціна: ")[1].split(" ")[0]) for d in data.split("\n") if "Ціна: " in d][:10]}]
+            }
+        except Exception as e:
+            logger.error(f"Market data API error: {str(e)}")
+            return {"error": str(e)}
+
+    @app.get("/api/db-stats")
+    async def db_stats():
+        return get_pool_stats()
+
+    @app.get("/api/cache-stats")
+    async def cache_stats():
+        return get_cache_stats()
+
+    @app.get("/api/crypto-stats")
+    async def crypto_stats():
+        return get_audit_stats()
+
+    @app.get("/api/network-stats")
+    async def network_stats():
+        return monitor.stats()
+
+    @app.get("/api/http-stats")
+    async def http_stats():
+        return http_clients.stats()
+
+    @app.get("/api/notify-stats")
+    async def notify_stats():
+        return notifier.stats()
+
+    @app.get("/api/inference-stats")
+    async def inference_stats():
+        return inference.stats()
+
+    @app.get("/api/stream-stats")
+    async def stream_stats_endpoint():
+        return stream_stats.stats()
+
+    @app.get("/api/model-stats")
+    async def model_stats():
+        return models.stats()
+
+    @app.get("/api/provider-stats")
+    async def provider_stats():
+        return provider_race.stats()
+
+    @app.get("/api/breaker-stats")
+    async def breaker_stats():
+        return breakers.stats()
+
+    @app.get("/api/semantic-cache-stats")
+    async def semantic_cache_stats():
+        return semantic_cache.stats()
+
+    @app.get("/api/context-stats")
+    async def context_stats():
+        return conversations.stats()
+
+    @app.get("/api/intent-stats")
+    async def intent_stats():
+        return router_stats()
+
+    @app.get("/api/scan-stats")
+    async def scan_stats():
+        return scan_engine.stats()
+
+    @app.get("/api/exchange-stats")
+    async def exchange_stats():
+        return exchange_sessions.stats()
+
+    @app.get("/api/market-feed-stats")
+    async def market_feed_stats():
+        return market_feed.stats()
+
+    @app.get("/api/indicator-stats")
+    async def indicator_stats():
+        return indicators.stats()
+
+    @app.get("/api/market-feed")
+    async def market_feed_candles(symbol: str = "BTC/USDT", timeframe: str = "1m", limit: int = 100):
+        return {"symbol": symbol, "timeframe": timeframe, "ticker": market_feed.ticker(symbol),
+                "candles": market_feed.candles(symbol, timeframe)[-limit:]}
+
+    @app.websocket("/ws/market")
+    async def market_websocket(websocket: WebSocket):
+        await websocket.accept()
+        symbols = websocket.query_params.get("symbols")
+        updates = market_feed.updates(symbols=symbols.split(",") if symbols else None, types=("kline", "ticker"))
+        try:
+            async with aclosing(updates):
+                await websocket.send_json({"type": "snapshot", "data": market_feed.snapshot()})
+                async for event in updates:
+                    await websocket.send_json(event)
+        except Exception:
+            pass  # Клієнт від'єднався; aclosing одразу знімає підписку
+
+    @app.websocket("/ws")
+    async def websocket_endpoint(websocket: WebSocket):
+        await websocket.accept()
+        user_id = "web_user"
+        websocket_sink.connect(user_id, websocket)
+        try:
+            while True:
+                try:
+                    data = await websocket.receive_json()
+                    command = data.get("command")
+                    stream = WebSocketStream(websocket)
+                    if command == "voice":
+                        text = await recognize_speech()
+                        response = await process_command(text, user_id, model, stream=stream)
+                    elif command == "upgrade":
+                        response = await request_zhanna_upgrade(user_id, command) if await is_online() else "Немає інтернету"
+                    elif command:
+                        response = await process_command(command, user_id, model, stream=stream)
+                    else:
+                        response = "Невідома команда"
+                    await learn_response(command, response)
+                    await stream.finish(response)
+                    await speak(response, user_id)
+                except Exception as e:
+                    logger.error(f"WebSocket error: {str(e)}")
+                    from plugins.self_improvement import handle_error
+                    await handle_error(str(e))
+                    await websocket.send_json({"error": str(e)})
+                    break
+        finally:
+            websocket_sink.disconnect(user_id, websocket)
+
     return app
\ No newline at end of file
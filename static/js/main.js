@@ -15,11 +15,28 @@ const translations = {
     }
 };
 
+let streamParagraph = null;
+
 socket.onmessage = function(event) {
     const data = JSON.parse(event.data);
     const responseDiv = document.getElementById("response");
-    if (data.response) {
-        responseDiv.innerHTML += `<p class="text-blue-400 animate-pulse">${translations.uk.response}: ${data.response}</p>`;
+    if (data.type === "token") {
+        // Потокова відповідь: токени дописуються в один абзац до фінального кадру
+        if (!streamParagraph) {
+            streamParagraph = document.createElement("p");
+            streamParagraph.className = "text-blue-400 animate-pulse";
+            streamParagraph.textContent = `${translations.uk.response}: `;
+            responseDiv.appendChild(streamParagraph);
+        }
+        streamParagraph.textContent += data.delta;
+        responseDiv.scrollTop = responseDiv.scrollHeight;
+    } else if (data.response) {
+        if (streamParagraph && data.type === "text") {
+            streamParagraph.textContent = `${translations.uk.response}: ${data.response}`;
+            streamParagraph = null;
+        } else {
+            responseDiv.innerHTML += `<p class="text-blue-400 animate-pulse">${translations.uk.response}: ${data.response}</p>`;
+        }
         responseDiv.scrollTop = responseDiv.scrollHeight;
         if (data.type === "text") {
             speak(data.response);
@@ -81,25 +98,28 @@ function checkOnlineStatus() {
         });
 }
 
+let marketChart = null;
+
 function updateChart() {
-    fetch("/api/market-data?symbol=ALL")
+    fetch("/api/market-feed?symbol=BTC/USDT&timeframe=1m&limit=100")
         .then(response => response.json())
         .then(data => {
             const ctx = document.getElementById("marketChart").getContext("2d");
-            new Chart(ctx, {
+            marketChart = new Chart(ctx, {
                 type: 'line',
                 data: {
-                    labels: data.labels,
-                    datasets: data.symbols.map(symbol => ({
-                        label: symbol.name,
-                        data: symbol.prices,
+                    labels: data.candles.map(candle => new Date(candle[0]).toLocaleTimeString()),
+                    datasets: [{
+                        label: data.symbol,
+                        data: data.candles.map(candle => candle[4]),
                         borderColor: `#${Math.floor(Math.random()*16777215).toString(16)}`,
                         backgroundColor: `rgba(0, 255, 204, 0.2)`,
                         fill: true
-                    }))
+                    }]
                 },
                 options: {
                     responsive: true,
+                    animation: false,
                     scales: {
                         x: { display: true, title: { display: true, text: 'Час' } },
                         y: { display: true, title: { display: true, text: 'Ціна (USD)' } }
@@ -110,10 +130,35 @@ function updateChart() {
                     }
                 }
             });
+            watchMarket(data.symbol, data.timeframe);
         })
         .catch(err => console.error("Chart error:", err));
 }
 
+function watchMarket(symbol, timeframe) {
+    // Свічки приходять з потоку ринкових даних — графік оновлюється без опитування
+    const marketSocket = new WebSocket("ws://" + window.location.host + "/ws/market?symbols=" + encodeURIComponent(symbol));
+    marketSocket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type !== "kline" || data.timeframe !== timeframe || !marketChart) return;
+        const labels = marketChart.data.labels;
+        const prices = marketChart.data.datasets[0].data;
+        const label = new Date(data.candle[0]).toLocaleTimeString();
+        if (labels[labels.length - 1] === label) {
+            prices[prices.length - 1] = data.candle[4];
+        } else if (!data.closed) {
+            labels.push(label);
+            prices.push(data.candle[4]);
+            if (labels.length > 100) {
+                labels.shift();
+                prices.shift();
+            }
+        }
+        marketChart.update("none");
+    };
+    marketSocket.onclose = () => setTimeout(() => watchMarket(symbol, timeframe), 5000);
+}
+
 function toggleTheme() {
     document.body.classList.toggle("light-theme");
     localStorage.setItem("theme", document.body.classList.contains("light-theme") ? "light" : "dark");
@@ -0,0 +1,81 @@
+﻿import csv
+import json
+import math
+import os
+import pytest
+from utils.indicators import IndicatorEngine
+
+# Синтетичні погодинні свічки BTC/USDT (формат fetch_ohlcv, фіксоване зерно генератора):
+# безперервне зростання на початку (RSI = 100), пласка ділянка 120–149 (std = 0) і ціни рівня 60000
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+OHLCV_PATH = os.path.join(FIXTURE_DIR, "BTC-USDT_1h.csv")
+# Значення ta 0.11 для цієї серії: "series" — за індексом свічки, "gap" — для свічок 250–299
+EXPECTED_PATH = os.path.join(FIXTURE_DIR, "BTC-USDT_1h.expected.json")
+KEYS = ("rsi", "sma", "bollinger_mavg", "bollinger_hband", "bollinger_lband")
+
+def load_ohlcv():
+    with open(OHLCV_PATH, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))[1:]
+    return [[int(row[0])] + [float(value) for value in row[1:]] for row in rows]
+
+def load_expected():
+    with open(EXPECTED_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+def assert_matches(actual, expected, label):
+    for key in KEYS:
+        if expected[key] is None:
+            assert math.isnan(actual[key]), f"{label} {key}: {actual[key]} замість NaN"
+        else:
+            assert math.isclose(actual[key], expected[key], rel_tol=1e-9, abs_tol=1e-9), \
+                f"{label} {key}: {actual[key]} замість {expected[key]}"
+
+def test_streaming_matches_ta():
+    """Потокові оновлення, зокрема незакритої свічки, дають значення ta.
+
+    300 свічок — 14 точних перерахунків сум вікна (кожні 20 закриттів).
+    """
+    engine = IndicatorEngine()
+    expected = load_expected()["series"]
+    for index, candle in enumerate(load_ohlcv()):
+        # Незакрита свічка кілька разів змінює ціну, перш ніж закритися
+        for close in (candle[4] * 1.002, candle[4] * 0.998):
+            engine.update("BTC/USDT", "1h", candle[:4] + [close, candle[5]])
+        values = engine.update("BTC/USDT", "1h", candle)
+        if str(index) in expected:
+            assert_matches(values, expected[str(index)], f"свічка {index}")
+
+def test_load_continues_and_rebuilds_after_gap():
+    """load() продовжує серію лише новими свічками, а після розриву будує її заново."""
+    engine = IndicatorEngine()
+    ohlcv = load_ohlcv()
+    expected = load_expected()
+    engine.load("BTC/USDT", "1h", ohlcv[:100])
+    # Перекриття з уже баченими свічками не має подвоювати їх у стані
+    assert_matches(engine.load("BTC/USDT", "1h", ohlcv[50:200]), expected["series"]["199"], "продовження")
+    assert engine.stats()["rebuilds"] == 1
+    assert_matches(engine.load("BTC/USDT", "1h", ohlcv[250:]), expected["gap"], "після розриву")
+    assert engine.stats()["rebuilds"] == 2
+
+def test_every_candle_matches_ta_library():
+    """Звірка з самою бібліотекою ta на кожній свічці (без pandas і ta тест пропускається)."""
+    pd = pytest.importorskip("pandas")
+    ta = pytest.importorskip("ta")
+    ohlcv = load_ohlcv()
+    close = pd.Series([candle[4] for candle in ohlcv])
+    bollinger = ta.volatility.BollingerBands(close)
+    reference = {
+        "rsi": ta.momentum.RSIIndicator(close).rsi(),
+        "sma": ta.trend.SMAIndicator(close, window=20).sma_indicator(),
+        "bollinger_mavg": bollinger.bollinger_mavg(),
+        "bollinger_hband": bollinger.bollinger_hband(),
+        "bollinger_lband": bollinger.bollinger_lband()
+    }
+    engine = IndicatorEngine()
+    for index, candle in enumerate(ohlcv):
+        values = engine.update("BTC/USDT", "1h", candle)
+        expected = {key: None if math.isnan(series.iloc[index]) else float(series.iloc[index]) for key, series in reference.items()}
+        assert_matches(values, expected, f"свічка {index}")
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
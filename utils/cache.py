@@ -0,0 +1,152 @@
+﻿import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# TTL (секунди) за префіксом ключа кешу; перший збіг виграє
+CACHE_TTLS = {
+    "market_": 60,
+    "search_": 3600,
+    "youtube_": 86400,
+    "xai_": 86400,
+    "learn_": 86400,
+    "semantic_": 86400
+}
+DEFAULT_TTL = 3600
+
+def ttl_for(key, ttls=CACHE_TTLS, default=DEFAULT_TTL):
+    """TTL для ключа за його префіксом."""
+    for prefix, ttl in ttls.items():
+        if key.startswith(prefix):
+            return ttl
+    return default
+
+class LRUCache:
+    """Потокобезпечний LRU-кеш у пам'яті з TTL для кожного запису."""
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = ttl_for(key) if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def purge_expired(self):
+        """Видалення прострочених записів, повертає їх кількість."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (_, expires_at) in self._data.items() if expires_at <= now]
+            for key in expired:
+                del self._data[key]
+            self.expirations += len(expired)
+        return len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+class SingleFlight:
+    """Об'єднання одночасних викликів з однаковим ключем в одне обчислення.
+
+    Результат передається через concurrent.futures.Future, тому чекати можуть
+    корутини з різних event loop (бот, GUI, фонові потоки).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key, func, *args, **kwargs):
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._calls[key] = future
+                    self.leaders += 1
+                else:
+                    self.shared += 1
+            if leader:
+                break
+            try:
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                # Лідера скасовано — пробуємо стати новим лідером
+                if future.cancelled():
+                    continue
+                raise
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            self._release(key)
+            future.cancel()
+            raise
+        except BaseException as e:
+            self._release(key)
+            future.set_exception(e)
+            raise
+        self._release(key)
+        future.set_result(result)
+        return result
+
+    def _release(self, key):
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def stats(self):
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "shared": self.shared
+        }
+
+single_flight = SingleFlight()
@@ -0,0 +1,226 @@
+﻿import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from config import (BASE_DIR, BREAKER_FAILURE_RATE, BREAKER_MIN_CALLS, BREAKER_WINDOW, BREAKER_OPEN_TIME,
+                    BREAKER_MAX_OPEN_TIME, ADAPTIVE_TIMEOUT_PERCENTILE, ADAPTIVE_TIMEOUT_FACTOR, ADAPTIVE_TIMEOUT_MIN)
+from utils.http_client import HTTP_PROVIDERS
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+LATENCY_SAMPLES = 200
+
+class CircuitOpenError(Exception):
+    """Провайдер вимкнено автоматичним вимикачем — виклик не виконується."""
+
+def _failed_response(result):
+    """HTTP 5xx і 429 вважаються збоєм провайдера, 4xx — помилкою запиту."""
+    status = getattr(result, "status_code", None)
+    return status is not None and (status >= 500 or status == 429)
+
+class CircuitBreaker:
+    """Автоматичний вимикач провайдера: closed → open → half_open → closed.
+
+    У стані closed рахується частка помилок за ковзне вікно; коли вона перевищує
+    поріг, вимикач розмикається і виклики відхиляються одразу, без мережі. Після
+    паузи пропускається один пробний виклик: успіх замикає вимикач, помилка
+    розмикає його знову з подвоєною паузою. Тайм-аут виклику — p99 затримок з
+    запасом, але не більше за тайм-аут провайдера. Тайм-аути теж потрапляють у
+    вибірку (на рівні межі, яку вони досягли), тож після кількох поспіль межа
+    розширюється, а пробний виклик завжди йде з тайм-аутом провайдера.
+    """
+
+    def __init__(self, name, default_timeout=30.0, failure_rate=BREAKER_FAILURE_RATE, min_calls=BREAKER_MIN_CALLS,
+                 window=BREAKER_WINDOW, open_time=BREAKER_OPEN_TIME, max_open_time=BREAKER_MAX_OPEN_TIME,
+                 percentile=ADAPTIVE_TIMEOUT_PERCENTILE, factor=ADAPTIVE_TIMEOUT_FACTOR, min_timeout=ADAPTIVE_TIMEOUT_MIN):
+        self.name = name
+        self.default_timeout = default_timeout
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.base_open_time = open_time
+        self.max_open_time = max_open_time
+        self.percentile = percentile
+        self.factor = factor
+        self.min_timeout = min_timeout
+        self.state = CLOSED
+        self.open_time = open_time
+        self._opened_at = 0.0
+        self._probing = False
+        self._calls = deque()
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "failures": 0, "timeouts": 0, "rejected": 0, "opened": 0}
+
+    def _trim(self, now):
+        while self._calls and now - self._calls[0][0] > self.window:
+            self._calls.popleft()
+
+    def _error_rate(self):
+        if not self._calls:
+            return 0.0
+        return sum(1 for _, ok in self._calls if not ok) / len(self._calls)
+
+    def _open(self, now):
+        self.state = OPEN
+        self._opened_at = now
+        self._probing = False
+        # Затримки до збою могли застаріти — після відновлення тайм-аут навчається заново
+        self._latencies.clear()
+        self._counters["opened"] += 1
+        logger.warning(f"Вимикач {self.name} розімкнено на {self.open_time:.0f} с (помилок {self._error_rate() * 100:.0f}%)")
+
+    def available(self):
+        """Чи буде виклик дозволено (без резервування пробного виклику)."""
+        with self._lock:
+            if self.state == OPEN:
+                return time.monotonic() - self._opened_at >= self.open_time
+            return not (self.state == HALF_OPEN and self._probing)
+
+    def allow(self):
+        """Дозвіл на виклик; у стані half_open резервує єдиний пробний виклик."""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_time:
+                self.state = HALF_OPEN
+                logger.info(f"Вимикач {self.name}: пробний виклик")
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self._counters["rejected"] += 1
+            return False
+
+    def release(self):
+        """Звільнення пробного виклику, що не дав результату (скасування)."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self, latency=None):
+        """Успішний виклик; latency — повний час відповіді для адаптивного тайм-ауту."""
+        now = time.monotonic()
+        with self._lock:
+            self._counters["calls"] += 1
+            if latency is not None:
+                self._latencies.append(latency)
+            if self.state == HALF_OPEN:
+                logger.info(f"Вимикач {self.name} замкнено")
+                self.state = CLOSED
+                self.open_time = self.base_open_time
+                self._probing = False
+                self._calls.clear()
+            self._calls.append((now, True))
+            self._trim(now)
+
+    def record_failure(self, timeout=False, limit=None):
+        """Збій виклику; limit — тайм-аут, який спрацював (стає зразком затримки)."""
+        now = time.monotonic()
+        with self._lock:
+            self._counters["calls"] += 1
+            self._counters["failures"] += 1
+            if timeout:
+                self._counters["timeouts"] += 1
+            if limit is not None:
+                self._latencies.append(limit)
+            if self.state == HALF_OPEN:
+                self.open_time = min(self.open_time * 2, self.max_open_time)
+                self._open(now)
+                return
+            self._calls.append((now, False))
+            self._trim(now)
+            if self.state == CLOSED and len(self._calls) >= self.min_calls and self._error_rate() >= self.failure_rate:
+                self._open(now)
+
+    def record_result(self, result, latency=None):
+        """Облік HTTP-відповіді: 5xx і 429 — збій, решта — успіх."""
+        if _failed_response(result):
+            self.record_failure()
+        else:
+            self.record_success(latency)
+
+    def timeout(self):
+        """Адаптивний тайм-аут: перцентиль затримок × запас у межах [мінімум, тайм-аут провайдера].
+
+        Поза станом closed (пробний виклик) — завжди тайм-аут провайдера: провайдер,
+        що став повільнішим за вивчену межу, інакше ніколи б не пройшов пробу.
+        """
+        with self._lock:
+            if self.state != CLOSED or len(self._latencies) < self.min_calls:
+                return self.default_timeout
+            ordered = sorted(self._latencies)
+        observed = ordered[min(int(len(ordered) * self.percentile / 100), len(ordered) - 1)]
+        return min(max(observed * self.factor, self.min_timeout), self.default_timeout)
+
+    async def call(self, func, *args, **kwargs):
+        """Виклик через вимикач з адаптивним тайм-аутом; CircuitOpenError — одразу, без мережі."""
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        start = time.perf_counter()
+        limit = self.timeout()
+        try:
+            result = await asyncio.wait_for(func(*args, **kwargs), limit)
+        except asyncio.TimeoutError:
+            self.record_failure(timeout=True, limit=limit)
+            raise
+        except asyncio.CancelledError:
+            # Скасування (наприклад, програш у гонці провайдерів) не свідчить про збій
+            self.release()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_result(result, time.perf_counter() - start)
+        return result
+
+    def stats(self):
+        timeout = self.timeout()
+        with self._lock:
+            self._trim(time.monotonic())
+            return {
+                "state": self.state,
+                **self._counters,
+                "window_calls": len(self._calls),
+                "error_rate": round(self._error_rate(), 3),
+                "timeout_s": round(timeout, 3),
+                "open_time_s": self.open_time if self.state != CLOSED else 0.0
+            }
+
+class CircuitBreakerRegistry:
+    """Спільні вимикачі за ім'ям провайдера (ті ж імена, що в HTTP_PROVIDERS)."""
+
+    def __init__(self, providers=HTTP_PROVIDERS):
+        self.providers = providers
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                default_timeout = self.providers.get(name, {}).get("timeout", 30.0)
+                breaker = self._breakers[name] = CircuitBreaker(name, default_timeout=default_timeout)
+            return breaker
+
+    def available(self, name):
+        return self.get(name).available()
+
+    def stats(self):
+        """Стан і метрики вимикачів."""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.stats() for breaker in breakers}
+
+breakers = CircuitBreakerRegistry()
@@ -0,0 +1,198 @@
+﻿import asyncio
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from config import BASE_DIR, CONTEXT_TOKEN_BUDGET, CONTEXT_SUMMARY_TOKENS, CONTEXT_MIN_TURNS, CONTEXT_MAX_USERS
+from database import get_context, save_context
+from utils.inference import inference
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+def estimate_tokens(text):
+    """Наближена кількість токенів (~3 символи на токен для змішаного українського й англійського тексту)."""
+    return (len(text) + 2) // 3
+
+def _format_turn(command, response):
+    return f"User: {command}\nSakura: {response}"
+
+class Conversation:
+    """Вікно розмови користувача: підсумок старих реплік і останні репліки дослівно.
+
+    epoch змінюється, коли вікно перебудовується (підсумовування, репліка не з
+    локальної моделі), — тоді чат-сесію GPT4All треба відкрити заново.
+    """
+
+    def __init__(self, summary="", turns=None):
+        self.summary = summary
+        self.turns = turns or []
+        self.epoch = 0
+        self.compacting = False
+
+    @classmethod
+    def load(cls, data):
+        if not data:
+            return cls()
+        try:
+            stored = json.loads(data)
+            return cls(stored.get("summary", ""), [tuple(turn) for turn in stored.get("turns", [])])
+        except (ValueError, AttributeError):
+            # Старий формат — довільний текст контексту
+            return cls(summary=data)
+
+    def dump(self):
+        return json.dumps({"summary": self.summary, "turns": self.turns}, ensure_ascii=False)
+
+    def tokens(self):
+        return estimate_tokens(self.summary) + sum(estimate_tokens(_format_turn(*turn)) for turn in self.turns)
+
+class ConversationManager:
+    """Контекст розмов у пам'яті з бюджетом токенів, збережений у таблиці context.
+
+    Промпт локальної моделі містить підсумок і стільки останніх реплік, скільки
+    вміщує бюджет. Коли вікно переповнюється, старі репліки у фоні стискаються в
+    підсумок. Поки epoch не змінився, репліки йдуть в одну чат-сесію GPT4All і
+    модель не переобчислює вже оброблену історію.
+    """
+
+    def __init__(self, budget=CONTEXT_TOKEN_BUDGET, summary_tokens=CONTEXT_SUMMARY_TOKENS,
+                 min_turns=CONTEXT_MIN_TURNS, max_users=CONTEXT_MAX_USERS):
+        self.budget = budget
+        self.summary_tokens = summary_tokens
+        self.min_turns = min_turns
+        self.max_users = max_users
+        self._conversations = OrderedDict()
+        self._lock = threading.Lock()
+        self._tasks = set()
+        self._counters = {"loads": 0, "turns": 0, "compactions": 0, "model_summaries": 0}
+
+    async def _get(self, user_id):
+        with self._lock:
+            conversation = self._conversations.get(user_id)
+            if conversation is not None:
+                self._conversations.move_to_end(user_id)
+                return conversation
+        loaded = Conversation.load(await get_context(user_id))
+        with self._lock:
+            self._counters["loads"] += 1
+            conversation = self._conversations.setdefault(user_id, loaded)
+            self._conversations.move_to_end(user_id)
+            while len(self._conversations) > self.max_users:
+                self._conversations.popitem(last=False)
+            return conversation
+
+    def _render(self, conversation, reserve):
+        """Підсумок і найновіші репліки в межах бюджету."""
+        available = self.budget - reserve - estimate_tokens(conversation.summary)
+        lines = []
+        for turn in reversed(conversation.turns):
+            text = _format_turn(*turn)
+            available -= estimate_tokens(text)
+            if available < 0:
+                break
+            lines.append(text)
+        lines.reverse()
+        if conversation.summary:
+            lines.insert(0, f"Підсумок попередньої розмови: {conversation.summary}")
+        return "\n".join(lines)
+
+    async def prepare(self, user_id, command):
+        """Чат-сесія (ключ, системний промпт) і промпт для локальної моделі."""
+        conversation = await self._get(user_id)
+        with self._lock:
+            key = (user_id, conversation.epoch)
+            system_prompt = self._render(conversation, estimate_tokens(command))
+        return (key, system_prompt), command
+
+    async def add_turn(self, user_id, command, response, session=None, model=None):
+        """Додавання репліки; session — сесія, в якій її згенеровано (None — не локальна модель)."""
+        if not response:
+            return
+        conversation = await self._get(user_id)
+        with self._lock:
+            if session is None or session[0] != (user_id, conversation.epoch):
+                # Репліки немає в KV-кеші поточної сесії
+                conversation.epoch += 1
+            conversation.turns.append((command, response))
+            self._counters["turns"] += 1
+            compact = (not conversation.compacting and len(conversation.turns) > self.min_turns
+                       and conversation.tokens() > self.budget)
+            if compact:
+                conversation.compacting = True
+            data = conversation.dump()
+        await save_context(user_id, data)
+        if compact:
+            task = asyncio.create_task(self._compact(user_id, conversation, model))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _compact(self, user_id, conversation, model):
+        """Стискання старих реплік у підсумок, доки вікно не займе половину бюджету."""
+        try:
+            with self._lock:
+                remaining = conversation.tokens()
+                count = 0
+                while len(conversation.turns) - count > self.min_turns and remaining > self.budget // 2:
+                    remaining -= estimate_tokens(_format_turn(*conversation.turns[count]))
+                    count += 1
+                old_turns = conversation.turns[:count]
+                summary = conversation.summary
+            if not count:
+                return
+            summary = await self._summarize(summary, old_turns, model)
+            with self._lock:
+                # Поки йшло підсумовування, репліки лише додавались у кінець
+                del conversation.turns[:count]
+                conversation.summary = summary
+                conversation.epoch += 1
+                self._counters["compactions"] += 1
+                data = conversation.dump()
+            await save_context(user_id, data)
+            logger.info(f"Контекст {user_id} стиснуто: {count} реплік у підсумок")
+        except Exception as e:
+            logger.error(f"Помилка стискання контексту {user_id}: {str(e)}")
+        finally:
+            conversation.compacting = False
+
+    async def _summarize(self, summary, turns, model):
+        dialog = "\n".join(_format_turn(*turn) for turn in turns)
+        if model is not None:
+            try:
+                prompt = (
+                    f"Стисло підсумуй розмову, зберігши факти й домовленості.\n"
+                    f"Попередній підсумок: {summary}\n{dialog}\nПідсумок:"
+                )
+                result = await inference.generate(model, prompt, max_tokens=self.summary_tokens)
+                if result and result.strip():
+                    with self._lock:
+                        self._counters["model_summaries"] += 1
+                    return result.strip()
+            except Exception as e:
+                logger.error(f"Помилка підсумовування моделлю: {str(e)}")
+        # Без моделі — початок кожної репліки; найновіше лишається, якщо не вміщається
+        lines = [summary] if summary else []
+        lines += [f"{command[:100]} — {response[:150]}" for command, response in turns]
+        return "; ".join(lines)[-self.summary_tokens * 3:]
+
+    def stats(self):
+        """Розміри вікон і лічильники стискання."""
+        with self._lock:
+            tokens = [conversation.tokens() for conversation in self._conversations.values()]
+            return {
+                "users": len(tokens),
+                "budget": self.budget,
+                "avg_tokens": round(sum(tokens) / len(tokens), 1) if tokens else 0.0,
+                "max_tokens": max(tokens, default=0),
+                **self._counters
+            }
+
+conversations = ConversationManager()
@@ -0,0 +1,144 @@
+﻿import asyncio
+import logging
+import os
+import threading
+import time
+import ccxt.async_support as ccxt
+from config import BASE_DIR, EXCHANGE_MARKETS_TTL
+from security import vault
+from utils.cache import single_flight
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+# Ключі сховища для облікових записів біржі
+ACCOUNTS = {
+    "default": ("BINANCE_TESTNET_API_KEY", "BINANCE_TESTNET_API_SECRET")
+}
+
+class ExchangeSessionManager:
+    """Довгоживучі клієнти ccxt з кешем ринків.
+
+    Один клієнт на (testnet, обліковий запис, event loop): ключі розшифровуються
+    один раз, а HTTP-сесія aiohttp з keep-alive перевикористовується між
+    запитами. Клієнт ccxt прив'язаний до циклу, в якому створений, тому, як і
+    HTTP-клієнти, зберігається за циклом. Ринки (exchangeInfo) спільні для всіх
+    клієнтів однієї мережі й перезавантажуються раз на EXCHANGE_MARKETS_TTL.
+    """
+
+    def __init__(self, accounts=ACCOUNTS, markets_ttl=EXCHANGE_MARKETS_TTL):
+        self.accounts = accounts
+        self.markets_ttl = markets_ttl
+        self._exchanges = {}
+        self._markets = {}
+        self._lock = threading.Lock()
+        self._counters = {"created": 0, "reused": 0, "markets_loads": 0, "markets_hits": 0}
+
+    def _create(self, testnet, account):
+        api_key, secret = self.accounts[account]
+        return ccxt.binance({
+            'apiKey': vault.get(api_key),
+            'secret': vault.get(secret),
+            'enableRateLimit': True,
+            'urls': {'api': 'https://testnet.binance.vision/api'} if testnet else {}
+        })
+
+    def _prune(self):
+        """Запасне прибирання клієнтів із циклів, закритих без close_loop()."""
+        for key in [key for key in self._exchanges if key[2].is_closed()]:
+            del self._exchanges[key]
+            # Закрити сесію aiohttp без її циклу вже неможливо
+            logger.warning(f"Клієнт біржі {key[1]} залишився незакритим після завершення свого циклу")
+
+    async def _load_markets(self, exchange, testnet):
+        markets = await exchange.load_markets(reload=True)
+        with self._lock:
+            self._markets[testnet] = (markets, exchange.currencies, time.monotonic())
+            self._counters["markets_loads"] += 1
+        logger.info(f"Ринки Binance ({'testnet' if testnet else 'mainnet'}) завантажено: {len(markets)}")
+        return markets
+
+    async def markets(self, exchange, testnet=True):
+        """Ринки з кешу; застарілі перезавантажуються одним запитом на всі цикли."""
+        with self._lock:
+            cached = self._markets.get(testnet)
+        if cached is None or time.monotonic() - cached[2] > self.markets_ttl:
+            await single_flight.do(f"exchange_markets_{testnet}", self._load_markets, exchange, testnet)
+        else:
+            with self._lock:
+                self._counters["markets_hits"] += 1
+        with self._lock:
+            markets, currencies, _ = self._markets[testnet]
+        if exchange.markets is not markets:
+            exchange.set_markets(markets, currencies)
+        return markets
+
+    async def get(self, testnet=True, account="default"):
+        """Клієнт біржі для поточного event loop з завантаженими ринками."""
+        key = (testnet, account, asyncio.get_running_loop())
+        with self._lock:
+            self._prune()
+            exchange = self._exchanges.get(key)
+            if exchange is None:
+                exchange = self._exchanges[key] = self._create(testnet, account)
+                self._counters["created"] += 1
+            else:
+                self._counters["reused"] += 1
+        await self.markets(exchange, testnet)
+        return exchange
+
+    async def close_loop(self):
+        """Закриття клієнтів поточного циклу; викликається до завершення asyncio.run у потоці."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            keys = [key for key in self._exchanges if key[2] is loop]
+            exchanges = [(key[1], self._exchanges.pop(key)) for key in keys]
+        for account, exchange in exchanges:
+            try:
+                await exchange.close()
+            except Exception as e:
+                logger.error(f"Помилка закриття клієнта біржі {account}: {str(e)}")
+
+    async def closing(self, coro):
+        """Виконання корутини потоку з закриттям його клієнтів біржі наприкінці: asyncio.run(exchange_sessions.closing(...))."""
+        try:
+            return await coro
+        finally:
+            await self.close_loop()
+
+    async def close(self):
+        """Закриття всіх клієнтів (кожен — у своєму циклі)."""
+        current = asyncio.get_running_loop()
+        with self._lock:
+            exchanges, self._exchanges = self._exchanges, {}
+        for (testnet, account, loop), exchange in exchanges.items():
+            try:
+                if loop is current:
+                    await exchange.close()
+                elif loop.is_running():
+                    await asyncio.wait_for(asyncio.wrap_future(asyncio.run_coroutine_threadsafe(exchange.close(), loop)), 5)
+            except Exception as e:
+                logger.error(f"Помилка закриття клієнта біржі {account}: {str(e)}")
+        logger.info("Клієнти біржі закрито")
+
+    def stats(self):
+        """Кількість клієнтів і ефективність кешу ринків."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "sessions": len(self._exchanges),
+                **self._counters,
+                "markets_age_s": {
+                    ("testnet" if testnet else "mainnet"): round(now - loaded_at, 1)
+                    for testnet, (_, _, loaded_at) in self._markets.items()
+                }
+            }
+
+exchange_sessions = ExchangeSessionManager()
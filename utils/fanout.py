@@ -0,0 +1,228 @@
+﻿import asyncio
+import bisect
+import logging
+import os
+import threading
+import time
+from config import BASE_DIR, PROVIDER_RACE_MODE, HEDGE_PERCENTILE, HEDGE_DEFAULT_DELAY, HEDGE_MIN_SAMPLES
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+RACE_MODES = ("sequential", "first_success", "hedged", "parallel")
+# Верхні межі кошиків гістограми (секунди)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+class LatencyHistogram:
+    """Гістограма затримок з фіксованими кошиками."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+
+    def percentile(self, p):
+        """Верхня межа кошика, що містить p-й перцентиль (None без даних)."""
+        if not self.total:
+            return None
+        rank = self.total * p / 100
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+        return self.buckets[-1]
+
+    def stats(self):
+        return {
+            "count": self.total,
+            "avg_ms": round(self.sum / self.total * 1000, 3) if self.total else 0.0,
+            "buckets": {f"le_{bound}": count for bound, count in zip(self.buckets + ("inf",), self.counts)}
+        }
+
+class ProviderFailed(Exception):
+    """Провайдер не дав відповіді (порожній результат)."""
+
+def single(func, *args, **kwargs):
+    """Провайдер без потокової відповіді: один фрагмент — повний результат."""
+    async def chunks():
+        yield await func(*args, **kwargs)
+    return chunks
+
+class RaceWinner:
+    """Провайдер-переможець: перший фрагмент і решта потоку."""
+
+    def __init__(self, name, first, rest):
+        self.name = name
+        self.first = first
+        self.rest = rest
+
+    async def chunks(self):
+        yield self.first
+        async for chunk in self.rest:
+            yield chunk
+
+    async def text(self):
+        return "".join([chunk async for chunk in self.chunks() if chunk])
+
+class ProviderRace:
+    """Гонка LLM-провайдерів: послідовно, перший успішний, хеджування або паралельно з пріоритетом.
+
+    Провайдер — пара (ім'я, фабрика асинхронного ітератора фрагментів). Переможцем
+    стає той, хто першим видав непорожній фрагмент; решта скасовуються. Затримка
+    першого фрагмента кожного провайдера йде в гістограму, з якої береться поріг
+    хеджування.
+    """
+
+    def __init__(self, mode=PROVIDER_RACE_MODE, percentile=HEDGE_PERCENTILE,
+                 default_delay=HEDGE_DEFAULT_DELAY, min_samples=HEDGE_MIN_SAMPLES):
+        if mode not in RACE_MODES:
+            logger.warning(f"Невідомий режим гонки провайдерів {mode}, використовується hedged")
+            mode = "hedged"
+        self.mode = mode
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _count(self, name, event):
+        with self._lock:
+            counters = self._counters.setdefault(name, {"wins": 0, "failures": 0, "cancelled": 0, "hedges": 0})
+            counters[event] += 1
+
+    def _observe(self, name, seconds):
+        with self._lock:
+            self._histograms.setdefault(name, LatencyHistogram()).observe(seconds)
+
+    def hedge_delay(self, name):
+        """Скільки чекати провайдера перед запуском наступного."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None or histogram.total < self.min_samples:
+                return self.default_delay
+            return histogram.percentile(self.percentile)
+
+    async def _first_chunk(self, name, factory):
+        start = time.perf_counter()
+        iterator = factory().__aiter__()
+        try:
+            async for chunk in iterator:
+                if chunk:
+                    self._observe(name, time.perf_counter() - start)
+                    return chunk, iterator
+            raise ProviderFailed(name)
+        except asyncio.CancelledError:
+            self._count(name, "cancelled")
+            raise
+        except Exception as e:
+            self._count(name, "failures")
+            if not isinstance(e, ProviderFailed):
+                logger.error(f"Провайдер {name} завершився помилкою: {str(e)}")
+            raise
+
+    async def run(self, providers, mode=None):
+        """Запуск гонки; повертає RaceWinner або None, якщо всі провайдери невдалі."""
+        mode = mode or self.mode
+        if mode == "sequential":
+            for name, factory in providers:
+                try:
+                    first, rest = await self._first_chunk(name, factory)
+                except Exception:
+                    continue
+                self._count(name, "wins")
+                return RaceWinner(name, first, rest)
+            return None
+        tasks = {}
+        results = {}
+        failed = set()
+        launched = 0
+        winner = None
+
+        def launch():
+            nonlocal launched
+            name, factory = providers[launched]
+            tasks[asyncio.ensure_future(self._first_chunk(name, factory))] = launched
+            launched += 1
+
+        for _ in range(1 if mode == "hedged" else len(providers)):
+            launch()
+        try:
+            while tasks or launched < len(providers):
+                if not tasks:
+                    launch()
+                    continue
+                timeout = None
+                if mode == "hedged" and launched < len(providers):
+                    timeout = self.hedge_delay(providers[launched - 1][0])
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Провайдер повільніший за свій перцентиль — запускаємо наступний паралельно
+                    self._count(providers[launched - 1][0], "hedges")
+                    launch()
+                    continue
+                failures = 0
+                for task in done:
+                    index = tasks.pop(task)
+                    if task.exception() is None:
+                        results[index] = task.result()
+                    else:
+                        failed.add(index)
+                        failures += 1
+                if mode == "parallel":
+                    # Приймаємо результат, лише коли всі провайдери з вищим пріоритетом невдалі
+                    for index in range(len(providers)):
+                        if index in results:
+                            winner = index
+                            break
+                        if index not in failed:
+                            break
+                elif results:
+                    winner = min(results)
+                if winner is not None:
+                    name = providers[winner][0]
+                    self._count(name, "wins")
+                    first, rest = results.pop(winner)
+                    return RaceWinner(name, first, rest)
+                if mode == "hedged" and failures and tasks and launched < len(providers):
+                    # Помилка не чекає порогу хеджування
+                    launch()
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            for _, rest in results.values():
+                await rest.aclose()
+
+    def stats(self):
+        """Гістограми затримок і лічильники за провайдерами."""
+        with self._lock:
+            names = set(self._histograms) | set(self._counters)
+            result = {
+                name: {
+                    **self._counters.get(name, {}),
+                    "latency": self._histograms[name].stats() if name in self._histograms else None
+                }
+                for name in names
+            }
+        for name, entry in result.items():
+            entry["hedge_delay_ms"] = round(self.hedge_delay(name) * 1000, 3)
+        return {"mode": self.mode, "providers": result}
+
+provider_race = ProviderRace()
@@ -0,0 +1,165 @@
+﻿import asyncio
+import logging
+import os
+import threading
+import time
+import httpx
+from config import BASE_DIR
+
+try:
+    import h2  # noqa: F401  HTTP/2 для httpx вимагає пакет h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+# Таймаути (секунди) і ліміти з'єднань для кожного провайдера
+HTTP_PROVIDERS = {
+    "xai": {"timeout": 30, "connect_timeout": 5, "max_connections": 10, "max_keepalive": 5},
+    "openai": {"timeout": 30, "connect_timeout": 5, "max_connections": 10, "max_keepalive": 5},
+    "llama": {"timeout": 30, "connect_timeout": 5, "max_connections": 5, "max_keepalive": 2},
+    "google": {"timeout": 10, "connect_timeout": 5, "max_connections": 10, "max_keepalive": 5},
+    "x": {"timeout": 10, "connect_timeout": 5, "max_connections": 5, "max_keepalive": 2},
+    "github": {"timeout": 10, "connect_timeout": 5, "max_connections": 5, "max_keepalive": 2},
+    "telegram": {"timeout": 10, "connect_timeout": 5, "max_connections": 20, "max_keepalive": 10},
+    "probe": {"timeout": 5, "connect_timeout": 3, "max_connections": 10, "max_keepalive": 4}
+}
+KEEPALIVE_EXPIRY = 60.0
+
+class _MeteredTransport(httpx.AsyncHTTPTransport):
+    """Транспорт httpx з лічильниками запитів для статистики пулу."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_time = 0.0
+
+    async def handle_async_request(self, request):
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        start = time.perf_counter()
+        try:
+            return await super().handle_async_request(request)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.total_time += time.perf_counter() - start
+
+    def connection_stats(self):
+        connections = getattr(self._pool, "connections", [])
+        idle = sum(1 for conn in connections if conn.is_idle())
+        http2 = sum(1 for conn in connections if getattr(conn, "_connection", None) is not None
+                    and type(conn._connection).__name__ == "AsyncHTTP2Connection")
+        return {"open": len(connections), "idle": idle, "http2": http2}
+
+class HttpClientRegistry:
+    """Спільні httpx-клієнти з keep-alive: один на провайдера і event loop.
+
+    Клієнт httpx прив'язаний до event loop, а бот, GUI і фонові задачі працюють
+    у різних потоках, тому клієнти зберігаються за парою (провайдер, цикл).
+    """
+
+    def __init__(self, providers=HTTP_PROVIDERS, http2=HTTP2_AVAILABLE):
+        self.providers = providers
+        self.http2 = http2
+        self._clients = {}
+        self._lock = threading.Lock()
+        if not http2:
+            logger.warning("Пакет h2 не встановлено, HTTP/2 вимкнено")
+
+    def _create(self, provider):
+        settings = self.providers.get(provider, self.providers["probe"])
+        transport = _MeteredTransport(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=settings["max_connections"],
+                max_keepalive_connections=settings["max_keepalive"],
+                keepalive_expiry=KEEPALIVE_EXPIRY
+            ),
+            retries=1
+        )
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"]),
+            follow_redirects=True
+        )
+
+    def get(self, provider):
+        """Клієнт провайдера для поточного event loop."""
+        loop = asyncio.get_running_loop()
+        key = (provider, loop)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            with self._lock:
+                self._prune()
+                client = self._clients.get(key)
+                if client is None or client.is_closed:
+                    client = self._create(provider)
+                    self._clients[key] = client
+        return client
+
+    def _prune(self):
+        """Видалення клієнтів із закритих циклів (asyncio.run у фонових потоках)."""
+        for key in [key for key in self._clients if key[1].is_closed()]:
+            del self._clients[key]
+
+    async def start(self, providers=None):
+        """Створення клієнтів для поточного циклу (викликається при старті)."""
+        for provider in providers or self.providers:
+            self.get(provider)
+        logger.info(f"HTTP-клієнти створено (HTTP/2: {self.http2})")
+
+    async def close(self):
+        """Закриття всіх клієнтів і їх з'єднань."""
+        current = asyncio.get_running_loop()
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for (provider, loop), client in clients.items():
+            try:
+                if loop is current:
+                    await client.aclose()
+                elif loop.is_running():
+                    await asyncio.wait_for(asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop)), 5)
+            except Exception as e:
+                logger.error(f"Помилка закриття HTTP-клієнта {provider}: {str(e)}")
+        logger.info("HTTP-клієнти закрито")
+
+    def stats(self):
+        """Статистика пулів за провайдерами (сума по всіх циклах)."""
+        result = {}
+        for (provider, _), client in list(self._clients.items()):
+            transport = client._transport
+            entry = result.setdefault(provider, {
+                "clients": 0, "requests": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0,
+                "total_time": 0.0, "open": 0, "idle": 0, "http2": 0,
+                "max_connections": self.providers.get(provider, self.providers["probe"])["max_connections"]
+            })
+            entry["clients"] += 1
+            entry["requests"] += transport.requests
+            entry["errors"] += transport.errors
+            entry["in_flight"] += transport.in_flight
+            entry["peak_in_flight"] = max(entry["peak_in_flight"], transport.peak_in_flight)
+            entry["total_time"] += transport.total_time
+            for name, value in transport.connection_stats().items():
+                entry[name] += value
+        for entry in result.values():
+            total_time = entry.pop("total_time")
+            entry["avg_ms"] = round(total_time / entry["requests"] * 1000, 3) if entry["requests"] else 0.0
+        return result
+
+http_clients = HttpClientRegistry()
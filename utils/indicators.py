@@ -0,0 +1,234 @@
+﻿import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from config import BASE_DIR
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+NAN = float("nan")
+
+class RollingStats:
+    """Середнє і стандартне відхилення (ddof=0) ковзного вікна закритих значень.
+
+    Суми рахуються відносно зсуву, близького до рівня ціни, щоб сума квадратів
+    не втрачала точність на великих цінах; раз на window закриттів суми
+    перераховуються точно (амортизовано O(1)), тож похибка не накопичується.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window - 1)
+        self._shift = None
+        self._sum = 0.0
+        self._squares = 0.0
+        self._since_refresh = 0
+
+    def _refresh(self):
+        self._shift = math.fsum(self.values) / len(self.values)
+        self._sum = math.fsum(value - self._shift for value in self.values)
+        self._squares = math.fsum((value - self._shift) ** 2 for value in self.values)
+        self._since_refresh = 0
+
+    def push(self, value):
+        """Закриття значення: у вікні лишаються window - 1 останніх, місце для поточного."""
+        if self._shift is None:
+            self._shift = value
+        if len(self.values) == self.values.maxlen:
+            removed = self.values[0] - self._shift
+            self._sum -= removed
+            self._squares -= removed * removed
+        self.values.append(value)
+        added = value - self._shift
+        self._sum += added
+        self._squares += added * added
+        self._since_refresh += 1
+        if self._since_refresh >= self.window:
+            self._refresh()
+
+    def evaluate(self, value):
+        """(середнє, стандартне відхилення) вікна із закритих значень і поточного; NaN, поки вікно неповне."""
+        count = len(self.values) + 1
+        if count < self.window:
+            return NAN, NAN
+        shift = value if self._shift is None else self._shift
+        delta = value - shift
+        mean = (self._sum + delta) / count
+        variance = max((self._squares + delta * delta) / count - mean * mean, 0.0)
+        return shift + mean, math.sqrt(variance)
+
+class WilderRSI:
+    """RSI зі згладжуванням Вайлдера, як ta.momentum.RSIIndicator.
+
+    Повторює ewm(alpha=1/window, adjust=False, min_periods=window) pandas:
+    перша різниця рахується нулем, а значення з'являється з window-го закриття.
+    """
+
+    def __init__(self, window=14):
+        self.window = window
+        com = (1.0 - 1.0 / window) / (1.0 / window)
+        self._alpha = 1.0 / (1.0 + com)
+        self._decay = 1.0 - self._alpha
+        self._count = 0
+        self._previous = None
+        self._up = 0.0
+        self._down = 0.0
+
+    def _step(self, up, down, value):
+        if self._previous is None:
+            return 0.0, 0.0
+        diff = value - self._previous
+        gain = diff if diff > 0 else 0.0
+        loss = -diff if diff < 0 else 0.0
+        if up != gain:
+            up = (self._decay * up + self._alpha * gain) / (self._decay + self._alpha)
+        if down != loss:
+            down = (self._decay * down + self._alpha * loss) / (self._decay + self._alpha)
+        return up, down
+
+    def push(self, value):
+        self._up, self._down = self._step(self._up, self._down, value)
+        self._previous = value
+        self._count += 1
+
+    def evaluate(self, value):
+        if self._count + 1 < self.window:
+            return NAN
+        up, down = self._step(self._up, self._down, value)
+        if down == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + up / down)
+
+class IndicatorState:
+    """Індикатори однієї серії свічок; остання свічка може ще оновлюватись.
+
+    Закриті свічки входять у стан один раз, а поточна лише оцінюється поверх
+    нього, тож і нова свічка, і оновлення незакритої коштують O(1).
+    """
+
+    def __init__(self, rsi_window=14, sma_window=20, bollinger_window=20, bollinger_dev=2):
+        self.rsi = WilderRSI(rsi_window)
+        self.sma = RollingStats(sma_window)
+        # Типові SMA20 і середня лінія Боллінджера — одне й те саме вікно
+        self.bollinger = self.sma if bollinger_window == sma_window else RollingStats(bollinger_window)
+        self.bollinger_dev = bollinger_dev
+        self.timestamp = None
+        self.close = None
+        self.values = None
+
+    def _push(self, close):
+        self.rsi.push(close)
+        self.sma.push(close)
+        if self.bollinger is not self.sma:
+            self.bollinger.push(close)
+
+    def update(self, candle):
+        """Оновлення свічкою [timestamp, open, high, low, close, volume]; запізнілі ігноруються."""
+        timestamp, close = candle[0], float(candle[4])
+        if self.timestamp is not None:
+            if timestamp < self.timestamp:
+                return self.values
+            if timestamp > self.timestamp:
+                self._push(self.close)
+        self.timestamp = timestamp
+        self.close = close
+        sma, _ = self.sma.evaluate(close)
+        mavg, std = self.bollinger.evaluate(close)
+        self.values = {
+            "timestamp": timestamp,
+            "close": close,
+            "rsi": self.rsi.evaluate(close),
+            "sma": sma,
+            "bollinger_mavg": mavg,
+            "bollinger_hband": mavg + self.bollinger_dev * std,
+            "bollinger_lband": mavg - self.bollinger_dev * std
+        }
+        return self.values
+
+class IndicatorEngine:
+    """Потокові RSI, SMA і смуги Боллінджера за (символ, таймфрейм) замість перерахунку pandas.
+
+    Результати збігаються з ta (RSIIndicator, SMAIndicator, BollingerBands із
+    типовими параметрами), застосованим до всієї серії, яку бачив стан. SMA і
+    Боллінджер залежать лише від вікна, а RSI Вайлдера — від усієї історії,
+    тому серія будується з 100+ свічок і далі лише продовжується.
+    """
+
+    def __init__(self, max_series=1024, **params):
+        self.max_series = max_series
+        self.params = params
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"updates": 0, "rebuilds": 0}
+        self._update_time = 0.0
+
+    def _state(self, key, reset=False):
+        state = None if reset else self._states.get(key)
+        if state is None:
+            state = self._states[key] = IndicatorState(**self.params)
+            while len(self._states) > self.max_series:
+                self._states.popitem(last=False)
+        self._states.move_to_end(key)
+        return state
+
+    def update(self, symbol, timeframe, candle):
+        """Нова свічка або оновлення поточної — O(1); повертає значення індикаторів."""
+        start = time.perf_counter()
+        with self._lock:
+            values = self._state((symbol, timeframe)).update(candle)
+            self._counters["updates"] += 1
+            self._update_time += time.perf_counter() - start
+            return values
+
+    def load(self, symbol, timeframe, ohlcv, reset=False):
+        """Продовження серії свічками ohlcv: застосовуються лише ще не бачені.
+
+        Якщо серія нова або між нею й ohlcv розрив, стан будується з ohlcv заново.
+        """
+        if not ohlcv:
+            return self.latest(symbol, timeframe)
+        start = time.perf_counter()
+        with self._lock:
+            state = self._states.get((symbol, timeframe))
+            if reset or state is None or state.timestamp < ohlcv[0][0]:
+                state = self._state((symbol, timeframe), reset=True)
+                self._counters["rebuilds"] += 1
+            else:
+                self._states.move_to_end((symbol, timeframe))
+            values = state.values
+            applied = 0
+            for candle in ohlcv:
+                if state.timestamp is None or candle[0] >= state.timestamp:
+                    values = state.update(candle)
+                    applied += 1
+            self._counters["updates"] += applied
+            self._update_time += time.perf_counter() - start
+            return values
+
+    def latest(self, symbol, timeframe):
+        """Останні значення серії або None."""
+        with self._lock:
+            state = self._states.get((symbol, timeframe))
+            return state.values if state else None
+
+    def stats(self):
+        """Кількість серій і середній час оновлення."""
+        with self._lock:
+            updates = self._counters["updates"]
+            return {
+                "series": len(self._states),
+                **self._counters,
+                "avg_update_us": round(self._update_time / updates * 1e6, 3) if updates else 0.0
+            }
+
+indicators = IndicatorEngine()
@@ -0,0 +1,243 @@
+﻿import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future, CancelledError
+from config import BASE_DIR, INFERENCE_CONCURRENCY, INFERENCE_TIMEOUT, INFERENCE_QUEUE_SIZE
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+class InferenceJob:
+    """Запит на генерацію з прапорцем скасування і часовими мітками."""
+
+    def __init__(self, model, prompt, kwargs, on_token=None, session=None):
+        self.model = model
+        self.prompt = prompt
+        self.kwargs = kwargs
+        self.on_token = on_token
+        self.session = session
+        self.future = Future()
+        self.cancelled = threading.Event()
+        self.submitted_at = time.perf_counter()
+        self.tokens = 0
+
+    def callback(self, token_id, response):
+        """Колбек GPT4All на кожен токен; False зупиняє генерацію."""
+        self.tokens += 1
+        if self.on_token and not self.cancelled.is_set():
+            self.on_token(response)
+        return not self.cancelled.is_set()
+
+    def cancel(self):
+        self.cancelled.set()
+        self.future.cancel()
+
+class InferenceWorker:
+    """Потоки інференсу GPT4All з чергою запитів, тайм-аутами і скасуванням.
+
+    Генерація блокує потік на секунди, тому виконується поза event loop. Один
+    екземпляр моделі не підтримує паралельну генерацію, тож доступ до кожної
+    моделі серіалізується, а concurrency > 1 корисне для кількох моделей.
+    """
+
+    def __init__(self, concurrency=INFERENCE_CONCURRENCY, timeout=INFERENCE_TIMEOUT, queue_size=INFERENCE_QUEUE_SIZE):
+        self.concurrency = max(concurrency, 1)
+        self.timeout = timeout
+        self._jobs = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._model_locks = weakref.WeakKeyDictionary()
+        self._sessions = weakref.WeakKeyDictionary()
+        self._running = 0
+        self._counters = {"requests": 0, "completed": 0, "cancelled": 0, "timeouts": 0, "failed": 0, "rejected": 0,
+                          "session_reused": 0, "session_resets": 0}
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._generation_time = 0.0
+        self._max_generation = 0.0
+        self._tokens = 0
+        self._generations = 0
+
+    def start(self):
+        """Запуск потоків інференсу (ідемпотентно)."""
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.concurrency):
+                thread = threading.Thread(target=self._worker, name=f"inference-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _model_lock(self, model):
+        with self._lock:
+            lock = self._model_locks.get(model)
+            if lock is None:
+                lock = self._model_locks[model] = threading.Lock()
+            return lock
+
+    def _worker(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            if not job.future.set_running_or_notify_cancel():
+                with self._lock:
+                    self._counters["cancelled"] += 1
+                continue
+            with self._model_lock(job.model):
+                self._run(job)
+
+    def _bind_session(self, job):
+        """Чат-сесія GPT4All для задачі (викликається під замком моделі).
+
+        Поки ключ сесії той самий, модель зберігає KV-кеш попередніх реплік і
+        обчислює лише новий запит. Інший ключ або задача без сесії закривають
+        поточну сесію, щоб чужі запити не потрапили в її історію.
+        """
+        current = self._sessions.get(job.model)
+        if job.session is not None and current is not None and current[0] == job.session[0]:
+            with self._lock:
+                self._counters["session_reused"] += 1
+            return
+        if current is not None:
+            del self._sessions[job.model]
+            try:
+                current[1].__exit__(None, None, None)
+            except Exception as e:
+                logger.error(f"Помилка закриття чат-сесії: {str(e)}")
+        if job.session is None:
+            return
+        key, system_prompt = job.session
+        try:
+            session = job.model.chat_session(system_prompt)
+            session.__enter__()
+        except Exception as e:
+            logger.error(f"Помилка відкриття чат-сесії: {str(e)}")
+            return
+        self._sessions[job.model] = (key, session)
+        with self._lock:
+            self._counters["session_resets"] += 1
+
+    def _run(self, job):
+        started = time.perf_counter()
+        wait = started - job.submitted_at
+        if job.cancelled.is_set():
+            with self._lock:
+                self._counters["cancelled"] += 1
+            job.future.set_exception(CancelledError())
+            return
+        with self._lock:
+            self._running += 1
+        try:
+            self._bind_session(job)
+            result = job.model.generate(job.prompt, callback=job.callback, **job.kwargs)
+            job.future.set_result(result)
+            status = "cancelled" if job.cancelled.is_set() else "completed"
+        except BaseException as e:
+            job.future.set_exception(e)
+            status = "failed"
+        generation = time.perf_counter() - started
+        with self._lock:
+            self._running -= 1
+            self._counters[status] += 1
+            self._generations += 1
+            self._wait_time += wait
+            self._max_wait = max(self._max_wait, wait)
+            self._generation_time += generation
+            self._max_generation = max(self._max_generation, generation)
+            self._tokens += job.tokens
+        logger.info(f"Інференс ({status}): очікування {wait * 1000:.0f} мс, генерація {generation * 1000:.0f} мс, токенів {job.tokens}")
+
+    def _submit(self, job):
+        self.start()
+        try:
+            self._jobs.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._counters["rejected"] += 1
+            raise RuntimeError("Черга інференсу переповнена")
+        with self._lock:
+            self._counters["requests"] += 1
+
+    async def generate(self, model, prompt, timeout=None, session=None, **kwargs):
+        """Генерація відповіді моделлю у потоці інференсу; session — (ключ, системний промпт) чат-сесії."""
+        job = InferenceJob(model, prompt, kwargs, session=session)
+        self._submit(job)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job.future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            job.cancel()
+            with self._lock:
+                self._counters["timeouts"] += 1
+            raise
+        except asyncio.CancelledError:
+            # Запущена генерація зупиняється через колбек на наступному токені
+            job.cancel()
+            raise
+
+    async def stream(self, model, prompt, timeout=None, session=None, **kwargs):
+        """Генерація з видачею токенів по мірі появи (асинхронний генератор)."""
+        loop = asyncio.get_running_loop()
+        tokens = asyncio.Queue()
+
+        def put(token):
+            # Колбек викликається в потоці інференсу
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(tokens.put_nowait, token)
+
+        job = InferenceJob(model, prompt, kwargs, on_token=put, session=session)
+        self._submit(job)
+        job.future.add_done_callback(lambda future: put(None))
+        deadline = loop.time() + (timeout or self.timeout)
+        try:
+            while True:
+                token = await asyncio.wait_for(tokens.get(), max(deadline - loop.time(), 0))
+                if token is None:
+                    break
+                yield token
+            job.future.result()
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._counters["timeouts"] += 1
+            raise
+        finally:
+            # Споживач зупинився раніше (скасування, тайм-аут, помилка) — зупиняємо генерацію
+            if not job.future.done():
+                job.cancel()
+
+    def stats(self):
+        """Метрики черги і часу генерації."""
+        finished = self._generations
+        return {
+            "workers": len(self._threads),
+            "queued": self._jobs.qsize(),
+            "running": self._running,
+            **self._counters,
+            "avg_queue_wait_ms": round(self._wait_time / finished * 1000, 3) if finished else 0.0,
+            "max_queue_wait_ms": round(self._max_wait * 1000, 3),
+            "avg_generation_ms": round(self._generation_time / finished * 1000, 3) if finished else 0.0,
+            "max_generation_ms": round(self._max_generation * 1000, 3),
+            "tokens_per_sec": round(self._tokens / self._generation_time, 3) if self._generation_time else 0.0
+        }
+
+    def stop(self):
+        """Зупинка потоків після завершення поточних генерацій."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._jobs.put(None)
+        for thread in threads:
+            thread.join()
+
+inference = InferenceWorker()
@@ -0,0 +1,182 @@
+﻿import logging
+import os
+import threading
+import time
+from collections import deque
+from config import BASE_DIR
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+ROUTERS = {}
+
+class AhoCorasick:
+    """Автомат Ахо-Корасік: усі входження всіх шаблонів за один прохід тексту."""
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+    def add(self, pattern, value):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = next_node
+        self._out[node].append((len(pattern), value))
+
+    def build(self):
+        """Побудова суфіксних посилань (обхід у ширину)."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def search(self, text):
+        """Генератор (початок, кінець, значення) для кожного входження."""
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, value in self._out[node]:
+                yield index - length + 1, index + 1, value
+
+def without(*words, lower=False):
+    """Екстрактор аргументу: текст команди без слів-тригерів."""
+    def extract(text):
+        if lower:
+            text = text.lower()
+        for word in words:
+            text = text.replace(word, "")
+        return (text.strip(),)
+    return extract
+
+class Intent:
+    """Намір: тригери, обробник, пріоритет і екстрактор аргументів."""
+
+    def __init__(self, name, triggers, handler, priority, order, extract=None):
+        self.name = name
+        self.triggers = tuple(trigger.lower() for trigger in triggers)
+        self.handler = handler
+        self.priority = priority
+        self.order = order
+        self.extract = extract
+        self.hits = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+class IntentRouter:
+    """Декларативна маршрутизація команд замість ланцюжків `if ... in command`.
+
+    Тригери всіх намірів компілюються в один автомат Ахо-Корасік, тож вибір
+    обробника — один прохід по тексту незалежно від кількості намірів. Серед
+    знайдених перемагає вищий пріоритет, за рівності — раніше зареєстрований.
+    Обробник викликається як handler(*extract(text), *args): без екстрактора
+    першим аргументом іде сам текст.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._intents = {}
+        self._automaton = None
+        self._lock = threading.Lock()
+        self._matches = 0
+        self._unmatched = 0
+        self._match_time = 0.0
+        ROUTERS[name] = self
+
+    def register(self, name, triggers, handler, priority=0, extract=None):
+        """Реєстрація наміру."""
+        with self._lock:
+            self._intents[name] = Intent(name, triggers, handler, priority, len(self._intents), extract)
+            self._automaton = None
+        return handler
+
+    def _compile(self):
+        automaton = AhoCorasick()
+        for intent in self._intents.values():
+            for trigger in intent.triggers:
+                automaton.add(trigger, intent)
+        automaton.build()
+        return automaton
+
+    def match(self, text):
+        """Намір з найвищим пріоритетом серед знайдених тригерів або None."""
+        start = time.perf_counter()
+        with self._lock:
+            if self._automaton is None:
+                self._automaton = self._compile()
+            automaton = self._automaton
+        text = text.lower()
+        best = None
+        for _, _, intent in automaton.search(text):
+            if best is None or (intent.priority, -intent.order) > (best.priority, -best.order):
+                best = intent
+        with self._lock:
+            self._match_time += time.perf_counter() - start
+            if best is None:
+                self._unmatched += 1
+            else:
+                self._matches += 1
+        return best
+
+    async def dispatch(self, text, *args, default=None):
+        """Виклик обробника наміру; без збігу — default(text, *args) або None."""
+        intent = self.match(text)
+        if intent is None:
+            return await default(text, *args) if default else None
+        extracted = intent.extract(text) if intent.extract else (text,)
+        start = time.perf_counter()
+        try:
+            return await intent.handler(*extracted, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                intent.hits += 1
+                intent.total_time += elapsed
+                intent.max_time = max(intent.max_time, elapsed)
+
+    def stats(self):
+        """Кількість спрацювань і затримка обробки за намірами."""
+        with self._lock:
+            routed = self._matches + self._unmatched
+            return {
+                "matched": self._matches,
+                "unmatched": self._unmatched,
+                "avg_match_us": round(self._match_time / routed * 1e6, 3) if routed else 0.0,
+                "intents": {
+                    intent.name: {
+                        "priority": intent.priority,
+                        "hits": intent.hits,
+                        "avg_ms": round(intent.total_time / intent.hits * 1000, 3) if intent.hits else 0.0,
+                        "max_ms": round(intent.max_time * 1000, 3)
+                    }
+                    for intent in self._intents.values()
+                }
+            }
+
+def router_stats():
+    """Статистика всіх маршрутизаторів."""
+    return {name: router.stats() for name, router in list(ROUTERS.items())}
+
+commands = IntentRouter("commands")
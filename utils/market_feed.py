@@ -0,0 +1,444 @@
+﻿import asyncio
+import csv
+import logging
+import os
+import threading
+import time
+from collections import deque
+from config import (BASE_DIR, MARKET_FEED_SOURCE, MARKET_FEED_SYMBOLS, MARKET_FEED_TIMEFRAMES, MARKET_FEED_BUFFER,
+                    MARKET_FEED_REPLAY_DIR, MARKET_FEED_REPLAY_SPEED)
+from utils.indicators import indicators
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+TIMEFRAME_MS = {
+    "1m": 60000, "3m": 180000, "5m": 300000, "15m": 900000, "30m": 1800000,
+    "1h": 3600000, "4h": 14400000, "1d": 86400000
+}
+
+def _split(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+class ReplayFinished(Exception):
+    """Записані дані потоку закінчились."""
+
+class CcxtProSource:
+    """Потоки kline, ticker і trade Binance через вебсокети ccxt.pro."""
+
+    name = "ccxt"
+
+    def __init__(self, testnet=True):
+        self.testnet = testnet
+        self.exchange = None
+
+    async def open(self):
+        import ccxt.pro as ccxtpro
+        # Публічні потоки не потребують ключів
+        self.exchange = ccxtpro.binance({'enableRateLimit': True})
+        if self.testnet:
+            self.exchange.set_sandbox_mode(True)
+
+    async def watch_ohlcv(self, symbol, timeframe):
+        return await self.exchange.watch_ohlcv(symbol, timeframe)
+
+    async def watch_ticker(self, symbol):
+        return await self.exchange.watch_ticker(symbol)
+
+    async def watch_trades(self, symbol):
+        return await self.exchange.watch_trades(symbol)
+
+    async def close(self):
+        if self.exchange is not None:
+            await self.exchange.close()
+
+class ReplaySource:
+    """Відтворення записаних свічок замість біржі (офлайн-тести, налагодження стратегій).
+
+    Файли {directory}/{BASE-QUOTE}_{timeframe}.csv з рядками
+    timestamp,open,high,low,close,volume — той самий формат, що й fetch_ohlcv.
+    Кожна свічка видається через TIMEFRAME_MS / speed мс; тікер і угода
+    будуються із закриття свічок першого запитаного таймфрейму символу.
+    """
+
+    name = "replay"
+
+    def __init__(self, directory=MARKET_FEED_REPLAY_DIR, speed=MARKET_FEED_REPLAY_SPEED):
+        self.directory = directory
+        self.speed = speed
+        self._cursors = {}
+        self._tick_timeframes = {}
+        self._ticks = {}
+        self._events = {}
+
+    def path_for(self, symbol, timeframe):
+        return os.path.join(self.directory, f"{symbol.replace('/', '-')}_{timeframe}.csv")
+
+    def _load(self, symbol, timeframe):
+        candles = []
+        with open(self.path_for(symbol, timeframe), newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                try:
+                    candles.append([int(float(row[0]))] + [float(value) for value in row[1:6]])
+                except (ValueError, IndexError):
+                    continue  # Заголовок або пошкоджений рядок
+        return candles
+
+    async def open(self):
+        if not os.path.isdir(self.directory):
+            raise FileNotFoundError(f"Каталог відтворення {self.directory} не знайдено")
+
+    def _event(self, symbol):
+        event = self._events.get(symbol)
+        if event is None:
+            event = self._events[symbol] = asyncio.Event()
+        return event
+
+    async def watch_ohlcv(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key not in self._cursors:
+            self._cursors[key] = [self._load(symbol, timeframe), 0]
+            self._tick_timeframes.setdefault(symbol, timeframe)
+        candles, position = self._cursors[key]
+        if position >= len(candles):
+            raise ReplayFinished(f"{symbol} {timeframe}")
+        if position:
+            await asyncio.sleep(TIMEFRAME_MS.get(timeframe, 60000) / 1000 / self.speed)
+        candle = candles[position]
+        self._cursors[key][1] += 1
+        if self._tick_timeframes[symbol] == timeframe:
+            self._ticks[symbol] = candle
+            # Будимо очікувачів тікера і угод; наступні чекатимуть на нову подію
+            event = self._events.pop(symbol, None)
+            if event is not None:
+                event.set()
+        return [candle]
+
+    async def _next_tick(self, symbol):
+        await self._event(symbol).wait()
+        return self._ticks[symbol]
+
+    async def watch_ticker(self, symbol):
+        timestamp, open_, high, low, close, volume = await self._next_tick(symbol)
+        return {
+            'symbol': symbol, 'timestamp': timestamp, 'open': open_, 'high': high, 'low': low,
+            'last': close, 'close': close, 'baseVolume': volume
+        }
+
+    async def watch_trades(self, symbol):
+        timestamp, open_, _, _, close, volume = await self._next_tick(symbol)
+        return [{
+            'symbol': symbol, 'timestamp': timestamp, 'price': close, 'amount': volume,
+            'side': 'buy' if close >= open_ else 'sell'
+        }]
+
+    async def close(self):
+        self._cursors.clear()
+
+class CandleBuffer:
+    """Останні свічки символу й таймфрейму; остання — ще незакрита."""
+
+    def __init__(self, maxlen):
+        self.candles = deque(maxlen=maxlen)
+
+    def update(self, candle):
+        """Застосування оновлення kline: (прийнято, закрита попередня свічка або None)."""
+        if self.candles:
+            last = self.candles[-1]
+            if candle[0] == last[0]:
+                self.candles[-1] = candle
+                return True, None
+            if candle[0] < last[0]:
+                return False, None  # Запізніле оновлення вже закритої свічки
+            self.candles.append(candle)
+            return True, last
+        self.candles.append(candle)
+        return True, None
+
+    def seed(self, ohlcv):
+        """Доповнення історією з REST: лише свічки, старіші за вже отримані з потоку."""
+        first = self.candles[0][0] if self.candles else None
+        room = self.candles.maxlen - len(self.candles)
+        older = [list(candle) for candle in ohlcv if first is None or candle[0] < first][-room:] if room else []
+        self.candles.extendleft(reversed(older))
+        return len(older)
+
+class _Subscriber:
+    """Черга подій у циклі споживача; при переповненні відкидаються найстаріші."""
+
+    def __init__(self, loop, maxsize, symbols, types):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.symbols = set(symbols) if symbols else None
+        self.types = set(types) if types else None
+        self.dropped = 0
+
+    def wants(self, event):
+        return ((self.symbols is None or event["symbol"] in self.symbols)
+                and (self.types is None or event["type"] in self.types))
+
+    def put(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+class MarketFeed:
+    """Живі ринкові дані з вебсокетів біржі замість опитування REST.
+
+    Потоки kline, ticker і trade читаються в окремому потоці з власним event
+    loop; свічки складаються в буфери за (символ, таймфрейм). Стратегії,
+    дашборд і GUI підписуються через updates() з будь-якого циклу, а
+    analyze_single_symbol бере історію з буфера замість fetch_ohlcv. Обірвані
+    потоки перепідключаються з експоненційною затримкою.
+    """
+
+    def __init__(self, symbols=None, timeframes=None, source=MARKET_FEED_SOURCE, buffer_size=MARKET_FEED_BUFFER,
+                 max_age=120.0):
+        self.symbols = symbols or _split(MARKET_FEED_SYMBOLS)
+        self.timeframes = timeframes or _split(MARKET_FEED_TIMEFRAMES)
+        self.source = source
+        self.max_age = max_age
+        self._buffers = {(symbol, timeframe): CandleBuffer(buffer_size)
+                         for symbol in self.symbols for timeframe in self.timeframes}
+        self._updated = {}
+        self._tickers = {}
+        self._trades = {symbol: deque(maxlen=100) for symbol in self.symbols}
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._loop = None
+        self._stopping = None
+        self._counters = {"klines": 0, "closed": 0, "tickers": 0, "trades": 0, "reconnects": 0,
+                          "history_hits": 0, "history_misses": 0, "seeded": 0, "dropped": 0}
+
+    def _make_source(self):
+        if not isinstance(self.source, str):
+            return self.source
+        if self.source == "replay":
+            return ReplaySource()
+        return CcxtProSource()
+
+    def start(self):
+        """Запуск потоку підписок (ідемпотентно)."""
+        with self._lock:
+            if self._thread:
+                return
+            self._thread = threading.Thread(target=self._thread_main, name="market-feed", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Закриття підписок і джерела; блокує до завершення потоку."""
+        with self._lock:
+            thread, loop, stopping = self._thread, self._loop, self._stopping
+        if thread is None:
+            return
+        if loop is not None and stopping is not None:
+            loop.call_soon_threadsafe(stopping.set)
+        thread.join(timeout=10)
+        with self._lock:
+            self._thread = None
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+
+    async def _run(self):
+        self._stopping = asyncio.Event()
+        source = self._make_source()
+        try:
+            await source.open()
+        except Exception as e:
+            logger.error(f"Джерело ринкових даних {source.name} недоступне: {str(e)}")
+            return
+        tasks = []
+        for symbol in self.symbols:
+            for timeframe in self.timeframes:
+                tasks.append(asyncio.create_task(self._watch("kline", source.watch_ohlcv, self._on_ohlcv, symbol, timeframe)))
+            tasks.append(asyncio.create_task(self._watch("ticker", source.watch_ticker, self._on_ticker, symbol)))
+            tasks.append(asyncio.create_task(self._watch("trade", source.watch_trades, self._on_trades, symbol)))
+        logger.info(f"Потік ринкових даних ({source.name}): {', '.join(self.symbols)} [{', '.join(self.timeframes)}]")
+        try:
+            await self._stopping.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await source.close()
+            except Exception as e:
+                logger.error(f"Помилка закриття джерела ринкових даних: {str(e)}")
+            logger.info("Потік ринкових даних зупинено")
+
+    async def _watch(self, kind, watch, handle, *args):
+        delay = 1.0
+        while True:
+            try:
+                handle(*args, await watch(*args))
+                delay = 1.0
+            except asyncio.CancelledError:
+                raise
+            except ReplayFinished:
+                logger.info(f"Відтворення {kind} {' '.join(args)} завершено")
+                return
+            except FileNotFoundError as e:
+                logger.warning(f"Немає даних для потоку {kind} {' '.join(args)}: {str(e)}")
+                return
+            except Exception as e:
+                with self._lock:
+                    self._counters["reconnects"] += 1
+                logger.warning(f"Потік {kind} {' '.join(args)} перервано: {str(e)}; повтор через {delay:.0f} с")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
+
+    def _on_ohlcv(self, symbol, timeframe, ohlcv):
+        events = []
+        with self._lock:
+            buffer = self._buffers[(symbol, timeframe)]
+            for candle in ohlcv:
+                accepted, closed = buffer.update(list(candle))
+                if not accepted:
+                    continue
+                if closed is not None:
+                    self._counters["closed"] += 1
+                    # Значення до оновлення — індикатори щойно закритої свічки
+                    events.append({"type": "kline", "symbol": symbol, "timeframe": timeframe, "candle": closed, "closed": True,
+                                   "indicators": indicators.latest(symbol, timeframe)})
+                self._counters["klines"] += 1
+                events.append({"type": "kline", "symbol": symbol, "timeframe": timeframe, "candle": list(candle), "closed": False,
+                               "indicators": indicators.update(symbol, timeframe, candle)})
+            self._updated[(symbol, timeframe)] = time.monotonic()
+        for event in events:
+            self._publish(event)
+
+    def _on_ticker(self, symbol, ticker):
+        data = {key: ticker.get(key) for key in ("timestamp", "last", "open", "high", "low", "bid", "ask", "baseVolume", "percentage")}
+        with self._lock:
+            self._tickers[symbol] = data
+            self._counters["tickers"] += 1
+        self._publish({"type": "ticker", "symbol": symbol, "ticker": data})
+
+    def _on_trades(self, symbol, trades):
+        events = []
+        with self._lock:
+            for trade in trades:
+                data = {key: trade.get(key) for key in ("timestamp", "price", "amount", "side")}
+                self._trades[symbol].append(data)
+                self._counters["trades"] += 1
+                events.append({"type": "trade", "symbol": symbol, "trade": data})
+        for event in events:
+            self._publish(event)
+
+    def _publish(self, event):
+        with self._lock:
+            subscribers = [subscriber for subscriber in self._subscribers if subscriber.wants(event)]
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.put, event)
+            except RuntimeError:
+                # Цикл підписника закрито, а генератор так і не завершився
+                with self._lock:
+                    self._subscribers.discard(subscriber)
+
+    async def updates(self, symbols=None, types=None, maxsize=1000):
+        """Події потоку в циклі споживача: kline (closed=True — свічку закрито), ticker, trade."""
+        subscriber = _Subscriber(asyncio.get_running_loop(), maxsize, symbols, types)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        try:
+            while True:
+                yield await subscriber.queue.get()
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+                self._counters["dropped"] += subscriber.dropped
+
+    def watching(self, symbol, timeframe):
+        return (symbol, timeframe) in self._buffers
+
+    def candles(self, symbol, timeframe):
+        """Копія буфера свічок (остання може бути незакритою)."""
+        with self._lock:
+            buffer = self._buffers.get((symbol, timeframe))
+            return [list(candle) for candle in buffer.candles] if buffer else []
+
+    def live(self, symbol, timeframe):
+        """Чи приходили оновлення потоку за останні max_age секунд."""
+        with self._lock:
+            updated = self._updated.get((symbol, timeframe))
+        return updated is not None and time.monotonic() - updated < self.max_age
+
+    def history(self, symbol, timeframe, limit):
+        """Останні limit свічок із живого буфера або None, якщо потрібен REST."""
+        candles = self.candles(symbol, timeframe) if self.live(symbol, timeframe) else []
+        with self._lock:
+            if len(candles) < limit:
+                self._counters["history_misses"] += 1
+                return None
+            self._counters["history_hits"] += 1
+        return candles[-limit:]
+
+    def seed(self, symbol, timeframe, ohlcv):
+        """Заповнення буфера історією з REST, щоб наступні запити обходились без неї."""
+        with self._lock:
+            buffer = self._buffers.get((symbol, timeframe))
+            if buffer is not None:
+                seeded = buffer.seed(ohlcv)
+                self._counters["seeded"] += seeded
+                if seeded:
+                    # Стара історія змінює RSI Вайлдера — серію перебудовуємо один раз
+                    indicators.load(symbol, timeframe, list(buffer.candles), reset=True)
+
+    def ticker(self, symbol):
+        with self._lock:
+            return self._tickers.get(symbol)
+
+    def trades(self, symbol):
+        with self._lock:
+            return list(self._trades.get(symbol, ()))
+
+    def snapshot(self):
+        """Останній тікер і свічка за кожним символом і таймфреймом."""
+        with self._lock:
+            return {
+                symbol: {
+                    "ticker": self._tickers.get(symbol),
+                    "candles": {
+                        timeframe: list(self._buffers[(symbol, timeframe)].candles[-1])
+                        for timeframe in self.timeframes if self._buffers[(symbol, timeframe)].candles
+                    }
+                }
+                for symbol in self.symbols
+            }
+
+    def stats(self):
+        """Обсяг подій, стан буферів і використання історії замість REST."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "source": self.source if isinstance(self.source, str) else self.source.name,
+                "running": self._thread is not None,
+                "subscribers": len(self._subscribers),
+                **self._counters,
+                "dropped": self._counters["dropped"] + sum(subscriber.dropped for subscriber in self._subscribers),
+                "buffers": {
+                    f"{symbol} {timeframe}": {
+                        "candles": len(buffer.candles),
+                        "age_s": round(now - self._updated[(symbol, timeframe)], 1) if (symbol, timeframe) in self._updated else None
+                    }
+                    for (symbol, timeframe), buffer in self._buffers.items()
+                }
+            }
+
+market_feed = MarketFeed()
@@ -0,0 +1,101 @@
+﻿import asyncio
+import logging
+import os
+import threading
+import time
+from config import BASE_DIR, MODEL_NAME
+from utils.inference import inference
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+class ModelRegistry:
+    """Спільні екземпляри GPT4All з ледачим завантаженням і підрахунком посилань.
+
+    Бекенд llama.cpp відображає файл ваг у пам'ять (mmap), тож один екземпляр на
+    процес означає одну копію ваг у RAM замість окремої для main, GUI і Zhanna.
+    Модель вивантажується, коли звільнено останнє посилання.
+    """
+
+    def __init__(self, model_dir=os.path.join(BASE_DIR, "models"), device="cpu"):
+        self.model_dir = model_dir
+        self.device = device
+        self._models = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def _load(self, name):
+        from gpt4all import GPT4All
+        start = time.perf_counter()
+        model = GPT4All(name, model_path=self.model_dir, device=self.device, allow_download=False)
+        load_ms = round((time.perf_counter() - start) * 1000, 3)
+        logger.info(f"Модель {name} завантажено за {load_ms} мс")
+        return {"model": model, "refs": 0, "load_ms": load_ms, "loaded_at": time.time(), "warm": False}
+
+    def acquire(self, name=MODEL_NAME):
+        """Спільний екземпляр моделі (завантажується при першому запиті)."""
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        # Окремий замок на модель: паралельні запити чекають одне завантаження, а не роблять два
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(name)
+                if entry is not None:
+                    entry["refs"] += 1
+                    return entry["model"]
+            entry = self._load(name)
+            entry["refs"] = 1
+            with self._lock:
+                self._models[name] = entry
+            return entry["model"]
+
+    async def acquire_async(self, name=MODEL_NAME):
+        """acquire() без блокування event loop на час завантаження."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.acquire, name)
+
+    def release(self, name=MODEL_NAME):
+        """Звільнення посилання; остання модель вивантажується."""
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is None:
+                return
+            entry["refs"] -= 1
+            if entry["refs"] > 0:
+                return
+            del self._models[name]
+        try:
+            entry["model"].close()
+        except Exception as e:
+            logger.error(f"Помилка вивантаження моделі {name}: {str(e)}")
+        logger.info(f"Модель {name} вивантажено")
+
+    async def warmup(self, name=MODEL_NAME):
+        """Прогрівання: коротка генерація підвантажує сторінки ваг і ініціалізує бекенд."""
+        with self._lock:
+            entry = self._models.get(name)
+        if entry is None or entry["warm"]:
+            return
+        start = time.perf_counter()
+        try:
+            await inference.generate(entry["model"], "Привіт", max_tokens=1)
+            entry["warm"] = True
+            logger.info(f"Модель {name} прогріто за {(time.perf_counter() - start) * 1000:.0f} мс")
+        except Exception as e:
+            logger.error(f"Помилка прогрівання моделі {name}: {str(e)}")
+
+    def stats(self):
+        """Завантажені моделі та кількість посилань."""
+        with self._lock:
+            return {
+                name: {"refs": entry["refs"], "load_ms": entry["load_ms"], "loaded_at": entry["loaded_at"], "warm": entry["warm"]}
+                for name, entry in self._models.items()
+            }
+
+models = ModelRegistry()
@@ -1,60 +1,189 @@
-﻿import httpx
-import asyncio
-import logging
-import os
-from config import BASE_DIR
-from utils.notify_user import notify_user
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
-
-async def is_online():
-    """Перевірка доступу до інтернету."""
-    endpoints = ["https://www.google.com", "https://api.x.com/ping"]
-    for url in endpoints:
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, timeout=5)
-                if response.status_code == 200:
-                    return True
-        except Exception:
-            continue
-    logger.warning("No internet connection detected.")
-    return False
-
-async def ping_endpoint(endpoint):
-    """Асинхронний пінг ендпоінту."""
-    try:
-        async with httpx.AsyncClient() as client:
-            start = asyncio.get_event_loop().time()
-            response = await client.get(endpoint, timeout=5)
-            latency = (asyncio.get_event_loop().time() - start) * 1000
-            if response.status_code == 200:
-                return f"{endpoint}: OK (Латентність: {latency:.2f} мс)"
-            return f"{endpoint}: Помилка ({response.status_code})"
-    except Exception as e:
-        return f"{endpoint}: Помилка ({str(e)})"
-
-async def check_network_status(user_id):
-    """Перевірка статусу мережі."""
-    try:
-        results = await asyncio.gather(
-            ping_endpoint("https://www.google.com"),
-            ping_endpoint("https://api.x.com/ping"),
-            ping_endpoint("https://api.binance.com/api/v3/ping")
-        )
-        result_text = "\n".join(results)
-        await notify_user(user_id, result_text)
-        return result_text
-    except Exception as e:
-        logger.error(f"Network status error: {str(e)}")
-        error_message = f"Помилка перевірки мережі: {str(e)}"
-        await notify_user(user_id, error_message)
+﻿import httpx
+import asyncio
+import logging
+import os
+import threading
+import time
+from config import BASE_DIR
+from utils.notify_user import notify_user
+from utils.http_client import http_clients
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+class ConnectivityMonitor:
+    """Фонова перевірка мережі з адаптивним інтервалом і кешованим станом.
+
+    Проби виконуються в окремому потоці з власним event loop, тож стан і
+    сповіщення про зміни доступні з будь-якого потоку чи циклу.
+    """
+
+    ENDPOINTS = ("https://www.google.com", "https://api.x.com/ping")
+
+    def __init__(self, endpoints=ENDPOINTS, timeout=3.0, min_interval=5.0, max_interval=120.0, offline_max_interval=30.0):
+        self.endpoints = endpoints
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.offline_max_interval = offline_max_interval
+        self.online = None
+        self.changed_at = None
+        self.checked_at = None
+        self.probes = 0
+        self.interval = min_interval
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._waiters = []
+        self._thread = None
+        self._loop = None
+        self._wakeup = None
+
+    def start(self):
+        """Запуск потоку моніторингу (ідемпотентно)."""
+        with self._lock:
+            if self._thread:
+                return
+            self._thread = threading.Thread(target=self._thread_main, name="connectivity-monitor", daemon=True)
+            self._thread.start()
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
+        self._loop.run_until_complete(self._run())
+
+    async def _probe_endpoint(self, url):
+        response = await http_clients.get("probe").get(url, timeout=self.timeout)
+        if response.status_code != 200:
+            raise httpx.HTTPStatusError(f"{url}: {response.status_code}", request=response.request, response=response)
+        return True
+
+    async def _probe(self):
+        tasks = [asyncio.create_task(self._probe_endpoint(url)) for url in self.endpoints]
+        try:
+            for task in asyncio.as_completed(tasks):
+                try:
+                    if await task:
+                        return True
+                except Exception:
+                    continue
+            return False
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _run(self):
+        while True:
+            online = await self._probe()
+            self._publish(online)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _publish(self, online):
+        now = time.time()
+        with self._lock:
+            self.probes += 1
+            self.checked_at = now
+            changed = online != self.online
+            if changed:
+                self.online = online
+                self.changed_at = now
+                self.interval = self.min_interval
+                waiters, self._waiters = self._waiters, []
+            else:
+                waiters = []
+                limit = self.max_interval if online else self.offline_max_interval
+                self.interval = min(self.interval * 2, limit)
+        self._ready.set()
+        if changed:
+            if online:
+                logger.info("Інтернет-з'єднання відновлено.")
+            else:
+                logger.warning("No internet connection detected.")
+        for loop, future in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(lambda f=future: f.done() or f.set_result(online))
+
+    def refresh(self):
+        """Позачергова перевірка (наприклад, після помилки мережі)."""
+        self.start()
+        loop = self._loop
+        if loop and self._wakeup:
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def wait_ready(self, timeout=None):
+        """Очікування результату першої перевірки."""
+        self.start()
+        if not self._ready.is_set():
+            await asyncio.get_running_loop().run_in_executor(None, self._ready.wait, timeout)
+        return bool(self.online)
+
+    async def wait_for_change(self, timeout=None):
+        """Очікування зміни стану; повертає новий стан."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            self._waiters.append((loop, future))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+
+    def stats(self):
+        return {
+            "online": self.online,
+            "checked_at": self.checked_at,
+            "changed_at": self.changed_at,
+            "interval": self.interval,
+            "probes": self.probes
+        }
+
+monitor = ConnectivityMonitor()
+
+async def is_online():
+    """Перевірка доступу до інтернету (кешований стан монітора, без мережевого запиту)."""
+    if monitor.online is None:
+        return await monitor.wait_ready(timeout=monitor.timeout + 1)
+    return monitor.online
+
+async def ping_endpoint(endpoint):
+    """Асинхронний пінг ендпоінту."""
+    try:
+        start = asyncio.get_event_loop().time()
+        response = await http_clients.get("probe").get(endpoint)
+        latency = (asyncio.get_event_loop().time() - start) * 1000
+        if response.status_code == 200:
+            return f"{endpoint}: OK (Латентність: {latency:.2f} мс)"
+        return f"{endpoint}: Помилка ({response.status_code})"
+    except Exception as e:
+        return f"{endpoint}: Помилка ({str(e)})"
+
+async def check_network_status(user_id):
+    """Перевірка статусу мережі."""
+    try:
+        results = await asyncio.gather(
+            ping_endpoint("https://www.google.com"),
+            ping_endpoint("https://api.x.com/ping"),
+            ping_endpoint("https://api.binance.com/api/v3/ping")
+        )
+        result_text = "\n".join(results)
+        await notify_user(user_id, result_text)
+        return result_text
+    except Exception as e:
+        logger.error(f"Network status error: {str(e)}")
+        error_message = f"Помилка перевірки мережі: {str(e)}"
+        await notify_user(user_id, error_message)
         return error_message
\ No newline at end of file
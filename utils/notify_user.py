@@ -1,48 +1,206 @@
-﻿import httpx
-import asyncio
-import logging
-import os
-from config import BASE_DIR, TELEGRAM_TOKEN
-from utils.network import is_online
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
-
-async def notify_user(user_id, message):
-    """Надсилання повідомлення користувачу через Telegram або GUI."""
-    try:
-        if await is_online() and TELEGRAM_TOKEN:
-            async with httpx.AsyncClient() as client:
-                url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-                data = {
-                    "chat_id": user_id,
-                    "text": message[:4096],  # Telegram обмеження
-                    "parse_mode": "Markdown"
-                }
-                response = await client.post(url, json=data, timeout=10)
-                if response.status_code == 200:
-                    logger.info(f"Повідомлення надіслано до {user_id}: {message[:100]}...")
-                    # Збереження взаємодії перенесено в викликаючий код, щоб уникнути циклічних імпортів
-                    return True
-                logger.error(f"Помилка Telegram API: {response.text}")
-        # Fallback: Логування в файл
-        logger.info(f"Офлайн повідомлення для {user_id}: {message}")
-        # Спроба через GUI (якщо активний)
-        try:
-            from gui import SakuraGUI
-            gui = SakuraGUI.instance()  # Припускаємо, що GUI має синглтон
-            if gui:
-                gui.add_message(f"Сакура: {message}")
-        except Exception:
-            pass
-        return False
-    except Exception as e:
-        logger.error(f"Помилка сповіщення: {str(e)}")
-        return False
\ No newline at end of file
+﻿import asyncio
+import logging
+import os
+import threading
+import time
+from config import BASE_DIR, TELEGRAM_TOKEN
+from utils.network import is_online
+from utils.outbox import outbox
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+class NotificationSink:
+    """Канал доставки сповіщень з лічильниками пропускної здатності і затримки.
+
+    Резервні канали (fallback=True) отримують повідомлення лише тоді, коли
+    жоден основний канал його не доставив.
+    """
+
+    name = "sink"
+    fallback = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self.sent = 0
+        self.failed = 0
+        self._total_time = 0.0
+        self._max_time = 0.0
+
+    def accepts(self, user_id):
+        """Чи може канал доставити повідомлення цьому користувачу."""
+        return True
+
+    async def send(self, user_id, message):
+        raise NotImplementedError
+
+    async def deliver(self, user_id, message):
+        start = time.perf_counter()
+        try:
+            delivered = await self.send(user_id, message)
+        except Exception as e:
+            logger.error(f"Помилка каналу сповіщень {self.name}: {str(e)}")
+            delivered = False
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            if delivered:
+                self.sent += 1
+            else:
+                self.failed += 1
+            self._total_time += elapsed
+            self._max_time = max(self._max_time, elapsed)
+        return delivered
+
+    def stats(self):
+        calls = self.sent + self.failed
+        uptime = time.monotonic() - self._started_at
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "per_minute": round(self.sent / uptime * 60, 3) if uptime else 0.0,
+            "avg_ms": round(self._total_time / calls * 1000, 3) if calls else 0.0,
+            "max_ms": round(self._max_time * 1000, 3)
+        }
+
+class TelegramSink(NotificationSink):
+    """Telegram через фонову чергу з одним спільним HTTP-клієнтом."""
+
+    name = "telegram"
+
+    def __init__(self, token=TELEGRAM_TOKEN, queue=outbox):
+        super().__init__()
+        self.token = token
+        self.queue = queue
+
+    def accepts(self, user_id):
+        return bool(self.token)
+
+    async def send(self, user_id, message):
+        # Дублікат або переповнена черга — не доставлено; без мережі повідомлення
+        # чекає в черзі, а користувач бачить його через резервний канал
+        if not self.queue.add(user_id, message):
+            return False
+        return await is_online()
+
+    def stats(self):
+        """Затримка — від постановки в чергу до відповіді Telegram, а не час постановки."""
+        outbox_stats = self.queue.stats()
+        return {
+            **super().stats(),
+            "delivered": outbox_stats["sent"],
+            "avg_ms": outbox_stats["avg_delivery_ms"],
+            "max_ms": outbox_stats["max_delivery_ms"],
+            "outbox": outbox_stats
+        }
+
+class WebSocketSink(NotificationSink):
+    """Активні websocket-з'єднання веб-інтерфейсу."""
+
+    name = "websocket"
+
+    def __init__(self):
+        super().__init__()
+        self._connections = {}
+
+    def connect(self, user_id, websocket):
+        with self._lock:
+            self._connections.setdefault(user_id, {})[websocket] = asyncio.get_running_loop()
+
+    def disconnect(self, user_id, websocket):
+        with self._lock:
+            connections = self._connections.get(user_id, {})
+            connections.pop(websocket, None)
+            if not connections:
+                self._connections.pop(user_id, None)
+
+    def accepts(self, user_id):
+        return bool(self._connections.get(user_id))
+
+    async def send(self, user_id, message):
+        with self._lock:
+            connections = list(self._connections.get(user_id, {}).items())
+        payload = {"response": message, "type": "notification"}
+        current = asyncio.get_running_loop()
+        delivered = False
+        for websocket, loop in connections:
+            try:
+                if loop is current:
+                    await websocket.send_json(payload)
+                else:
+                    # З'єднання належить циклу uvicorn, а сповіщення може прийти з іншого потоку
+                    await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(websocket.send_json(payload), loop))
+                delivered = True
+            except Exception as e:
+                logger.error(f"Помилка надсилання у websocket {user_id}: {str(e)}")
+                self.disconnect(user_id, websocket)
+        return delivered
+
+class GUISink(NotificationSink):
+    """Чат вікна GUI (резервний канал, як і раніше — коли інші недоступні)."""
+
+    name = "gui"
+    fallback = True
+
+    def __init__(self, gui):
+        super().__init__()
+        self.gui = gui
+
+    async def send(self, user_id, message):
+        # Tkinter не потокобезпечний — оновлення виконує головний цикл вікна
+        self.gui.root.after(0, self.gui.add_message, f"Сакура: {message}")
+        return True
+
+class Notifier:
+    """Єдина точка сповіщень із підключуваними каналами."""
+
+    def __init__(self):
+        self._sinks = {}
+        self._lock = threading.Lock()
+
+    def register_sink(self, sink):
+        with self._lock:
+            self._sinks[sink.name] = sink
+        return sink
+
+    def unregister_sink(self, name):
+        with self._lock:
+            self._sinks.pop(name, None)
+
+    async def notify(self, user_id, message):
+        with self._lock:
+            sinks = list(self._sinks.values())
+        primary = [sink for sink in sinks if not sink.fallback and sink.accepts(user_id)]
+        results = await asyncio.gather(*(sink.deliver(user_id, message) for sink in primary))
+        if any(results):
+            return True
+        logger.info(f"Офлайн повідомлення для {user_id}: {message}")
+        for sink in sinks:
+            if sink.fallback and sink.accepts(user_id):
+                await sink.deliver(user_id, message)
+        return False
+
+    def stats(self):
+        """Метрики за каналами."""
+        with self._lock:
+            sinks = list(self._sinks.values())
+        return {sink.name: sink.stats() for sink in sinks}
+
+notifier = Notifier()
+notifier.register_sink(TelegramSink())
+websocket_sink = notifier.register_sink(WebSocketSink())
+
+async def notify_user(user_id, message):
+    """Надсилання повідомлення користувачу через Telegram, websocket або GUI."""
+    try:
+        return await notifier.notify(user_id, message)
+    except Exception as e:
+        logger.error(f"Помилка сповіщення: {str(e)}")
+        return False
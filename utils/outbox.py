@@ -0,0 +1,314 @@
+﻿import asyncio
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from cryptography.fernet import InvalidToken
+from config import BASE_DIR, TELEGRAM_TOKEN, OUTBOX_PATH, NOTIFY_COALESCE_WINDOW, NOTIFY_CHAT_INTERVAL, NOTIFY_GLOBAL_RATE, NOTIFY_DEDUP_WINDOW
+from security import crypto
+from utils.http_client import http_clients
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LENGTH = 4096  # Telegram обмеження
+
+class TelegramOutbox:
+    """Черга вихідних повідомлень Telegram з об'єднанням, лімітами швидкості і збереженням на диск.
+
+    Виклики add() лише ставлять повідомлення в чергу; доставку виконує окремий
+    потік зі своїм event loop, тож затримка команд не включає запити до Telegram.
+    """
+
+    def __init__(self, token=TELEGRAM_TOKEN, path=OUTBOX_PATH, window=NOTIFY_COALESCE_WINDOW,
+                 chat_interval=NOTIFY_CHAT_INTERVAL, global_rate=NOTIFY_GLOBAL_RATE,
+                 dedup_window=NOTIFY_DEDUP_WINDOW, max_pending=1000, retry_delay=5.0):
+        self.token = token
+        self.path = path
+        self.window = window
+        self.chat_interval = chat_interval
+        self.global_rate = global_rate
+        self.dedup_window = dedup_window
+        self.max_pending = max_pending
+        self.retry_delay = retry_delay
+        # chat_id -> {"texts": [...], "since": час першого повідомлення в пачці}
+        self._pending = OrderedDict()
+        self._count = 0
+        self._recent = {}
+        self._next_allowed = {}
+        self._tokens = float(global_rate)
+        self._refilled_at = time.monotonic()
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._thread = None
+        self._loop = None
+        self._wakeup = None
+        self._stopping = False
+        self._counters = {"queued": 0, "sent": 0, "merged": 0, "duplicates": 0, "rate_limited": 0,
+                          "failed": 0, "dropped": 0, "restored": 0}
+        self._delivery_time = 0.0
+        self._max_delivery_time = 0.0
+
+    def start(self):
+        """Запуск потоку доставки з відновленням збережених повідомлень."""
+        with self._lock:
+            if self._thread:
+                return
+            self._stopping = False
+            self._load()
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._thread_main, args=(ready,), name="telegram-outbox", daemon=True)
+            self._thread.start()
+        ready.wait()
+
+    def _thread_main(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
+        ready.set()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    def _notify(self):
+        loop = self._loop
+        if loop and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    def add(self, chat_id, text):
+        """Постановка повідомлення в чергу; повертає False для дубліката."""
+        chat_id = str(chat_id)
+        now = time.monotonic()
+        with self._lock:
+            sent_at = self._recent.get((chat_id, text))
+            entry = self._pending.get(chat_id)
+            if (sent_at and now - sent_at < self.dedup_window) or (entry and text in entry["texts"]):
+                self._counters["duplicates"] += 1
+                return False
+            if self._count >= self.max_pending:
+                self._counters["dropped"] += 1
+                logger.error(f"Черга повідомлень переповнена, повідомлення для {chat_id} втрачено")
+                return False
+            if entry is None:
+                entry = self._pending[chat_id] = {"texts": [], "since": now}
+            entry["texts"].append(text)
+            self._count += 1
+            self._counters["queued"] += 1
+            self._dirty = True
+        if not self._thread:
+            self.start()
+        self._notify()
+        return True
+
+    def _take_batch(self, chat_id):
+        """Об'єднання повідомлень чату в одне в межах ліміту довжини Telegram."""
+        texts = self._pending[chat_id]["texts"]
+        batch, length = [], 0
+        for text in texts:
+            extra = len(text) + (2 if batch else 0)
+            if batch and length + extra > MAX_MESSAGE_LENGTH:
+                break
+            batch.append(text)
+            length += extra
+        return batch
+
+    def _due_chats(self, now):
+        """Чати, готові до відправки, і час до наступного готового."""
+        due, wait = [], None
+        with self._lock:
+            for chat_id, entry in self._pending.items():
+                # При зупинці вікно об'єднання не чекаємо, але ліміти чату зберігаємо
+                window = 0 if self._stopping else self.window
+                ready_at = max(entry["since"] + window, self._next_allowed.get(chat_id, 0))
+                if ready_at <= now:
+                    due.append(chat_id)
+                else:
+                    wait = ready_at - now if wait is None else min(wait, ready_at - now)
+        return due, wait
+
+    def _take_token(self, now):
+        self._tokens = min(float(self.global_rate), self._tokens + (now - self._refilled_at) * self.global_rate)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def _run(self):
+        # Відкладений імпорт: utils.network імпортує notify_user, а той — цей модуль
+        from utils.network import monitor
+        deadline = None
+        while True:
+            now = time.monotonic()
+            if self._stopping and deadline is None:
+                deadline = now + 5.0
+            if deadline and (not self._count or now >= deadline):
+                break
+            wait = self.retry_delay
+            if monitor.online is not False:
+                due, next_wait = self._due_chats(now)
+                sends = []
+                for chat_id in due:
+                    if not self._take_token(now):
+                        next_wait = 1.0 / self.global_rate
+                        break
+                    with self._lock:
+                        batch = self._take_batch(chat_id)
+                    sends.append(self._send(chat_id, batch))
+                if sends:
+                    await asyncio.gather(*sends)
+                    self._persist()
+                    continue
+                if next_wait is not None:
+                    wait = next_wait
+                elif not self._count:
+                    wait = None
+            self._persist()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), wait if deadline is None else min(wait or 0.1, 0.1))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+        self._persist()
+
+    async def _send(self, chat_id, batch):
+        text = "\n\n".join(batch)[:MAX_MESSAGE_LENGTH]
+        url = f"https://api.telegram.org/bot{self.token}/sendMessage"
+        data = {"chat_id": chat_id, "text": text, "parse_mode": "Markdown"}
+        try:
+            client = http_clients.get("telegram")
+            response = await client.post(url, json=data)
+            if response.status_code == 400 and "parse" in response.text:
+                # Об'єднана пачка може зламати Markdown — повтор простим текстом
+                data.pop("parse_mode")
+                response = await client.post(url, json=data)
+            if response.status_code == 200:
+                self._delivered(chat_id, batch)
+                logger.info(f"Повідомлення надіслано до {chat_id}: {text[:100]}...")
+            elif response.status_code == 429:
+                retry_after = response.json().get("parameters", {}).get("retry_after", self.retry_delay)
+                self._counters["rate_limited"] += 1
+                self._next_allowed[chat_id] = time.monotonic() + retry_after
+                logger.warning(f"Ліміт Telegram для {chat_id}, повтор через {retry_after} с")
+            elif response.status_code >= 500:
+                self._counters["failed"] += 1
+                self._next_allowed[chat_id] = time.monotonic() + self.retry_delay
+                logger.error(f"Помилка Telegram API: {response.text}")
+            else:
+                # 400/403: чат не існує або бот заблокований — повтор не допоможе
+                self._delivered(chat_id, batch, sent=False)
+                self._counters["dropped"] += len(batch)
+                logger.error(f"Помилка Telegram API: {response.text}")
+        except Exception as e:
+            self._counters["failed"] += 1
+            self._next_allowed[chat_id] = time.monotonic() + self.retry_delay
+            logger.error(f"Помилка доставки повідомлення до {chat_id}: {str(e)}")
+
+    def _delivered(self, chat_id, batch, sent=True):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._pending[chat_id]
+            del entry["texts"][:len(batch)]
+            self._count -= len(batch)
+            if sent:
+                self._delivery_time += now - entry["since"]
+                self._max_delivery_time = max(self._max_delivery_time, now - entry["since"])
+                self._counters["sent"] += 1
+                self._counters["merged"] += len(batch) - 1
+                for text in batch:
+                    self._recent[(chat_id, text)] = now
+            if entry["texts"]:
+                entry["since"] = now
+            else:
+                del self._pending[chat_id]
+            self._next_allowed[chat_id] = now + self.chat_interval
+            self._dirty = True
+            expired = [key for key, sent_at in self._recent.items() if now - sent_at >= self.dedup_window]
+            for key in expired:
+                del self._recent[key]
+
+    def _persist(self):
+        """Збереження недоставлених повідомлень (атомарна заміна файлу).
+
+        Знімок шифрується тим самим ключем, що й історія: у черзі відповіді LLM,
+        торгові плани і сповіщення безпеки.
+        """
+        if not self._dirty or not self.path:
+            return
+        with self._lock:
+            snapshot = {chat_id: list(entry["texts"]) for chat_id, entry in self._pending.items()}
+            self._dirty = False
+        try:
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+            payload = crypto.cipher().encrypt(json.dumps(snapshot, ensure_ascii=False).encode()).decode()
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".outbox-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            self._dirty = True
+            logger.error(f"Помилка збереження черги повідомлень: {str(e)}")
+
+    def _load(self):
+        """Відновлення повідомлень, не доставлених до попереднього завершення."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = f.read()
+            if payload.lstrip().startswith("{"):
+                # Незашифрований знімок попередньої версії: перезапишеться зашифрованим
+                snapshot = json.loads(payload)
+                self._dirty = True
+            else:
+                snapshot = json.loads(crypto.cipher().decrypt(payload.encode()))
+        except (OSError, ValueError, InvalidToken) as e:
+            logger.error(f"Помилка читання черги повідомлень: {str(e)}")
+            return
+        now = time.monotonic()
+        for chat_id, texts in snapshot.items():
+            if texts:
+                entry = self._pending.setdefault(chat_id, {"texts": [], "since": now})
+                entry["texts"].extend(text for text in texts if text not in entry["texts"])
+        self._count = sum(len(entry["texts"]) for entry in self._pending.values())
+        self._counters["restored"] += self._count
+        if self._count:
+            logger.info(f"Відновлено {self._count} недоставлених повідомлень")
+
+    def stats(self):
+        """Метрики черги повідомлень."""
+        sent = self._counters["sent"]
+        return {
+            "pending": self._count,
+            "chats": len(self._pending),
+            **self._counters,
+            "avg_delivery_ms": round(self._delivery_time / sent * 1000, 3) if sent else 0.0,
+            "max_delivery_ms": round(self._max_delivery_time * 1000, 3)
+        }
+
+    def stop(self):
+        """Зупинка потоку: доставка готових повідомлень і збереження залишку."""
+        thread = self._thread
+        if not thread:
+            return
+        self._stopping = True
+        self._notify()
+        thread.join()
+        self._thread = None
+
+outbox = TelegramOutbox()
+atexit.register(outbox.stop)
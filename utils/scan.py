@@ -0,0 +1,126 @@
+﻿import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from config import BASE_DIR, SCAN_CONCURRENCY, SCAN_EXCHANGE_CONCURRENCY, SCAN_SEARCH_CONCURRENCY, SCAN_XAI_CONCURRENCY
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+# Одночасні запити на ресурс: біржа і зовнішні провайдери
+SCAN_LIMITS = {
+    "exchange": SCAN_EXCHANGE_CONCURRENCY,
+    "search": SCAN_SEARCH_CONCURRENCY,
+    "xai": SCAN_XAI_CONCURRENCY
+}
+
+class ScanEngine:
+    """Паралельний скан з обмеженнями: загальним і окремо для біржі та кожного провайдера.
+
+    Етапи обробки символу загортаються в stage(): семафор ресурсу не дає
+    заспамити біржу чи провайдера, а час очікування і виконання кожного етапу
+    потрапляє в статистику. ccxt з enableRateLimit сам розносить запити в часі,
+    семафор лише обмежує, скільки їх стоїть у його черзі. Семафори asyncio
+    прив'язані до event loop, тому зберігаються за парою (ресурс, цикл).
+    """
+
+    def __init__(self, concurrency=SCAN_CONCURRENCY, limits=SCAN_LIMITS):
+        self.concurrency = concurrency
+        self.limits = limits
+        self._semaphores = {}
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._scans = {"scans": 0, "items": 0, "last_ms": 0.0, "max_ms": 0.0, "total_ms": 0.0}
+
+    def _semaphore(self, resource):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for key in [key for key in self._semaphores if key[1].is_closed()]:
+                del self._semaphores[key]
+            semaphore = self._semaphores.get((resource, loop))
+            if semaphore is None:
+                semaphore = self._semaphores[(resource, loop)] = asyncio.Semaphore(self.limits.get(resource, self.concurrency))
+            return semaphore
+
+    def _record(self, name, wait, elapsed):
+        with self._lock:
+            stage = self._stages.setdefault(name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "wait_ms": 0.0})
+            stage["calls"] += 1
+            stage["total_ms"] += elapsed * 1000
+            stage["max_ms"] = max(stage["max_ms"], elapsed * 1000)
+            stage["wait_ms"] += wait * 1000
+
+    @asynccontextmanager
+    async def stage(self, name, resource=None):
+        """Етап обробки; resource — назва обмеженого ресурсу (exchange, search, xai)."""
+        queued = time.perf_counter()
+        if resource is None:
+            start = queued
+            try:
+                yield
+            finally:
+                self._record(name, 0.0, time.perf_counter() - start)
+            return
+        async with self._semaphore(resource):
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self._record(name, start - queued, time.perf_counter() - start)
+
+    async def run(self, items, worker):
+        """Обробка елементів worker(item) паралельно; видає (елемент, результат) по мірі готовності."""
+        start = time.perf_counter()
+        limit = asyncio.Semaphore(self.concurrency)
+
+        async def process(item):
+            async with limit:
+                return item, await worker(item)
+
+        tasks = [asyncio.ensure_future(process(item)) for item in items]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._scans["scans"] += 1
+                self._scans["items"] += len(tasks)
+                self._scans["last_ms"] = elapsed
+                self._scans["max_ms"] = max(self._scans["max_ms"], elapsed)
+                self._scans["total_ms"] += elapsed
+            logger.info(f"Скан {len(tasks)} елементів за {elapsed:.0f} мс")
+
+    def stats(self):
+        """Час сканів і таймінги етапів."""
+        with self._lock:
+            scans = self._scans["scans"]
+            return {
+                "scans": scans,
+                "items": self._scans["items"],
+                "last_scan_ms": round(self._scans["last_ms"], 3),
+                "avg_scan_ms": round(self._scans["total_ms"] / scans, 3) if scans else 0.0,
+                "max_scan_ms": round(self._scans["max_ms"], 3),
+                "stages": {
+                    name: {
+                        "calls": stage["calls"],
+                        "avg_ms": round(stage["total_ms"] / stage["calls"], 3),
+                        "max_ms": round(stage["max_ms"], 3),
+                        "avg_wait_ms": round(stage["wait_ms"] / stage["calls"], 3)
+                    }
+                    for name, stage in self._stages.items()
+                }
+            }
+
+scan_engine = ScanEngine()
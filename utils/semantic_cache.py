@@ -0,0 +1,295 @@
+﻿import asyncio
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+import numpy as np
+from config import BASE_DIR, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_MAX_ENTRIES, SEMANTIC_EMBED_MODEL, SEMANTIC_EMBED_DIM
+from database import get_cached_response, save_cached_response, save_semantic_entry, get_semantic_entries, delete_semantic_entry
+from utils.cache import LRUCache, ttl_for
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+def _normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class HashedNgramEmbedder:
+    """Резервні ембедінги без моделі: хешовані символьні 3-грами і слова.
+
+    Лексична подібність не відрізняє «2023» від «2019» чи додане «не» (схожість
+    понад 0.95), тому з цими векторами кеш шукає лише точні збіги запитів.
+    """
+
+    semantic = False
+
+    def __init__(self, dim=SEMANTIC_EMBED_DIM):
+        self.dim = dim
+        self.name = f"ngram-{dim}"
+
+    def embed(self, text):
+        words = re.findall(r"\w+", text.lower())
+        padded = f" {' '.join(words)} "
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in [padded[i:i + 3] for i in range(len(padded) - 2)] + words:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            # Старший біт хешу задає знак, щоб колізії кошиків гасили одна одну
+            vector[digest % self.dim] += 1.0 if digest & 0x80000000 else -1.0
+        return _normalize(vector)
+
+class GPT4AllEmbedder:
+    """Локальна CPU-модель ембедінгів gpt4all (Embed4All)."""
+
+    semantic = True
+
+    def __init__(self, model_name=SEMANTIC_EMBED_MODEL, model_dir=os.path.join(BASE_DIR, "models")):
+        self.name = model_name
+        self.model_dir = model_dir
+        self._model = None
+
+    def load(self):
+        from gpt4all import Embed4All
+        self._model = Embed4All(self.name, model_path=self.model_dir, allow_download=False, device="cpu")
+
+    def embed(self, text):
+        return _normalize(self._model.embed(text))
+
+class SemanticCache:
+    """Семантичний кеш відповідей LLM: збіг за косинусною подібністю, а не за текстом.
+
+    Вектори запитів тримаються в матриці NumPy (один рядок на запис) з власником
+    і часом спливання, тож пошук — одне множення матриці на вектор лише серед
+    записів користувача. Самі відповіді зберігаються в таблиці cache під ключем
+    semantic_*, а вектори — поруч у таблиці semantic_cache для відновлення після
+    перезапуску.
+    """
+
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, max_entries=SEMANTIC_CACHE_MAX_ENTRIES, embedder=None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._embedder = embedder
+        self._embedder_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._recent = LRUCache(max_entries=256)
+        self._vectors = None
+        self._owners = None
+        self._expires = None
+        self._saved = None
+        self._keys = []
+        self._slots = {}
+        self._free = []
+        self._users = {}
+        self._size = 0
+        self._counters = {"lookups": 0, "hits": 0, "misses": 0, "stored": 0, "evictions": 0}
+        self._saved_ms = 0.0
+        self._embed_time = 0.0
+        self._embeds = 0
+
+    def _load_embedder(self):
+        with self._embedder_lock:
+            if self._embedder is None:
+                embedder = GPT4AllEmbedder()
+                try:
+                    embedder.load()
+                except Exception as e:
+                    logger.warning(f"Модель ембедінгів {embedder.name} недоступна ({str(e)}), семантичний пошук вимкнено — лише точні збіги")
+                    embedder = HashedNgramEmbedder()
+                self._embedder = embedder
+            return self._embedder
+
+    async def _embed(self, text):
+        vector = self._recent.get(text)
+        if vector is not None:
+            return vector
+        loop = asyncio.get_running_loop()
+        embedder = self._embedder or await loop.run_in_executor(None, self._load_embedder)
+        start = time.perf_counter()
+        vector = await loop.run_in_executor(None, embedder.embed, text)
+        with self._lock:
+            self._embed_time += time.perf_counter() - start
+            self._embeds += 1
+        # lookup() і store() одного запиту рахують ембедінг один раз
+        self._recent.set(text, vector, ttl=300)
+        return vector
+
+    @staticmethod
+    def key_for(user_id, text):
+        digest = hashlib.sha256(f"{user_id}\n{text}".encode("utf-8")).hexdigest()
+        return f"semantic_{digest[:32]}"
+
+    def _allocate(self, dim):
+        capacity = min(64, self.max_entries)
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._owners = np.full(capacity, -1, dtype=np.int32)
+        self._expires = np.zeros(capacity, dtype=np.float64)
+        self._saved = np.zeros(capacity, dtype=np.float32)
+
+    def _grow(self):
+        capacity = min(len(self._owners) * 2, self.max_entries)
+        extra = capacity - len(self._owners)
+        self._vectors = np.vstack([self._vectors, np.zeros((extra, self._vectors.shape[1]), dtype=np.float32)])
+        self._owners = np.concatenate([self._owners, np.full(extra, -1, dtype=np.int32)])
+        self._expires = np.concatenate([self._expires, np.zeros(extra, dtype=np.float64)])
+        self._saved = np.concatenate([self._saved, np.zeros(extra, dtype=np.float32)])
+
+    def _remove_slot(self, slot):
+        self._slots.pop(self._keys[slot], None)
+        self._keys[slot] = None
+        self._owners[slot] = -1
+        self._free.append(slot)
+
+    def _take_slot(self, now):
+        if self._free:
+            return self._free.pop()
+        if self._size == len(self._owners) and self._size < self.max_entries:
+            self._grow()
+        if self._size < len(self._owners):
+            self._keys.append(None)
+            self._size += 1
+            return self._size - 1
+        # Індекс заповнено: спершу звільняємо прострочені, інакше — той, що спливає найраніше
+        for slot in np.flatnonzero((self._owners[:self._size] >= 0) & (self._expires[:self._size] <= now)):
+            self._remove_slot(int(slot))
+        if self._free:
+            return self._free.pop()
+        slot = int(np.argmin(np.where(self._owners[:self._size] >= 0, self._expires[:self._size], np.inf)))
+        self._remove_slot(slot)
+        self._counters["evictions"] += 1
+        return self._free.pop()
+
+    def _insert(self, key, user_id, vector, ttl, saved_ms):
+        now = time.monotonic()
+        with self._lock:
+            if self._vectors is None:
+                self._allocate(len(vector))
+            if len(vector) != self._vectors.shape[1]:
+                return
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._take_slot(now)
+            self._vectors[slot] = vector
+            self._owners[slot] = self._users.setdefault(user_id, len(self._users))
+            self._expires[slot] = now + ttl
+            self._saved[slot] = saved_ms
+            self._keys[slot] = key
+            self._slots[key] = slot
+
+    def _search(self, user_id, vector):
+        with self._lock:
+            owner = self._users.get(user_id)
+            if owner is None or self._vectors is None or len(vector) != self._vectors.shape[1]:
+                return None
+            candidates = np.flatnonzero((self._owners[:self._size] == owner) & (self._expires[:self._size] > time.monotonic()))
+            if not len(candidates):
+                return None
+            scores = self._vectors[candidates] @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            slot = int(candidates[best])
+            return self._keys[slot], float(scores[best]), float(self._saved[slot])
+
+    def _forget(self, key):
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is not None:
+                self._remove_slot(slot)
+
+    def _semantic(self, embedder):
+        return getattr(embedder, "semantic", True)
+
+    async def lookup(self, user_id, text):
+        """Кешована відповідь на схожий запит цього користувача або None."""
+        try:
+            embedder = self._embedder or await asyncio.get_running_loop().run_in_executor(None, self._load_embedder)
+            semantic = self._semantic(embedder)
+            if semantic:
+                match = self._search(user_id, await self._embed(text))
+            else:
+                # Без моделі ембедінгів — лише точний збіг запиту
+                match = (self.key_for(user_id, text), 1.0, 0.0)
+            response = None
+            if match is not None:
+                key, score, saved_ms = match
+                response = await get_cached_response(key)
+                if response is None and semantic:
+                    # Відповідь витіснено з кешу — вектор більше не потрібен
+                    self._forget(key)
+                    await delete_semantic_entry(key)
+            with self._lock:
+                self._counters["lookups"] += 1
+                if response is None:
+                    self._counters["misses"] += 1
+                    return None
+                self._counters["hits"] += 1
+                self._saved_ms += saved_ms
+            logger.info(f"Семантичний кеш: збіг {score:.3f} для {user_id}")
+            return response
+        except Exception as e:
+            logger.error(f"Помилка пошуку в семантичному кеші: {str(e)}")
+            return None
+
+    async def store(self, user_id, text, response, generation_time=0.0):
+        """Збереження відповіді; generation_time — скільки коштувала генерація (для статистики)."""
+        if not response:
+            return
+        try:
+            key = self.key_for(user_id, text)
+            ttl = ttl_for(key)
+            saved_ms = generation_time * 1000
+            embedder = self._embedder or await asyncio.get_running_loop().run_in_executor(None, self._load_embedder)
+            if not self._semantic(embedder):
+                await save_cached_response(key, response, ttl=ttl)
+                with self._lock:
+                    self._counters["stored"] += 1
+                return
+            vector = await self._embed(text)
+            await save_cached_response(key, response, ttl=ttl)
+            self._insert(key, user_id, vector, ttl, saved_ms)
+            await save_semantic_entry(key, user_id, self._embedder.name, vector.tobytes(), saved_ms, ttl)
+            with self._lock:
+                self._counters["stored"] += 1
+        except Exception as e:
+            logger.error(f"Помилка збереження в семантичний кеш: {str(e)}")
+
+    async def load(self):
+        """Відновлення індексу з таблиці semantic_cache для поточної моделі ембедінгів."""
+        embedder = self._embedder or await asyncio.get_running_loop().run_in_executor(None, self._load_embedder)
+        if not self._semantic(embedder):
+            logger.info(f"Семантичний кеш: {embedder.name} — лише точні збіги, індекс не завантажується")
+            return
+        rows = await get_semantic_entries(embedder.name)
+        for key, user_id, embedding, saved_ms, remaining in rows:
+            if remaining and remaining > 0:
+                self._insert(key, user_id, np.frombuffer(bytes(embedding), dtype=np.float32), float(remaining), saved_ms or 0.0)
+        logger.info(f"Семантичний кеш: завантажено {len(self._slots)} записів ({embedder.name})")
+
+    def stats(self):
+        """Влучання, промахи і зекономлений час генерації."""
+        with self._lock:
+            lookups = self._counters["lookups"]
+            return {
+                "entries": len(self._slots),
+                "max_entries": self.max_entries,
+                "embedder": self._embedder.name if self._embedder else None,
+                "semantic_matching": self._semantic(self._embedder) if self._embedder else None,
+                "threshold": self.threshold,
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else 0.0,
+                "saved_generation_ms": round(self._saved_ms, 3),
+                "avg_embed_ms": round(self._embed_time / self._embeds * 1000, 3) if self._embeds else 0.0
+            }
+
+semantic_cache = SemanticCache()
@@ -0,0 +1,164 @@
+﻿import logging
+import os
+import threading
+import time
+from collections import deque
+from config import BASE_DIR, STREAM_EDIT_INTERVAL
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(BASE_DIR, "sakura.log"), encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LENGTH = 4096  # Telegram обмеження
+
+class StreamStats:
+    """Час до першого токена (TTFT) за джерелом відповіді."""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._ttft = {}
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def record_first_token(self, source, ttft):
+        with self._lock:
+            self._ttft.setdefault(source, deque(maxlen=self.window)).append(ttft)
+
+    def record_tokens(self, source, count):
+        with self._lock:
+            self._tokens[source] = self._tokens.get(source, 0) + count
+
+    def stats(self):
+        result = {}
+        with self._lock:
+            for source, samples in self._ttft.items():
+                ordered = sorted(samples)
+                result[source] = {
+                    "streams": len(ordered),
+                    "tokens": self._tokens.get(source, 0),
+                    "avg_ttft_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+                    "p50_ttft_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+                    "p95_ttft_ms": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000, 3)
+                }
+        return result
+
+stream_stats = StreamStats()
+
+class ResponseStream:
+    """Споживач потокової відповіді process_command.
+
+    relay() передає токени джерела в канал по мірі появи; finish() викликає
+    обробник команди з остаточним текстом — і для потокових, і для звичайних відповідей.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.first_token_at = None
+        self.text = ""
+
+    async def relay(self, source, tokens):
+        """Передача токенів асинхронного генератора; повертає повний текст джерела."""
+        parts = []
+        async for delta in tokens:
+            if not delta:
+                continue
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+                stream_stats.record_first_token(source, self.first_token_at - self.started_at)
+            parts.append(delta)
+            self.text += delta
+            try:
+                await self.on_delta(delta)
+            except Exception as e:
+                logger.error(f"Помилка потокової доставки: {str(e)}")
+        stream_stats.record_tokens(source, len(parts))
+        return "".join(parts)
+
+    @property
+    def streamed(self):
+        return self.first_token_at is not None
+
+    async def on_delta(self, delta):
+        pass
+
+    async def finish(self, text):
+        """Остаточна відповідь (замінює частковий текст, якщо він був)."""
+        try:
+            await self.on_finish(text)
+        except Exception as e:
+            logger.error(f"Помилка завершення потокової відповіді: {str(e)}")
+
+    async def on_finish(self, text):
+        pass
+
+class WebSocketStream(ResponseStream):
+    """Кадри {"type": "token"} у websocket, потім звичайна відповідь."""
+
+    def __init__(self, websocket):
+        super().__init__()
+        self.websocket = websocket
+
+    async def on_delta(self, delta):
+        await self.websocket.send_json({"delta": delta, "type": "token"})
+
+    async def on_finish(self, text):
+        await self.websocket.send_json({"response": text, "type": "text"})
+
+class TelegramStream(ResponseStream):
+    """Відповідь Telegram, що оновлюється через editMessageText не частіше за інтервал."""
+
+    def __init__(self, message, interval=STREAM_EDIT_INTERVAL, min_chars=20):
+        super().__init__()
+        self.message = message
+        self.interval = interval
+        self.min_chars = min_chars
+        self.reply = None
+        self._sent_text = ""
+        self._sent_at = 0.0
+
+    async def _edit(self, text):
+        text = text[:MAX_MESSAGE_LENGTH]
+        if text == self._sent_text:
+            return
+        await self.reply.edit_text(text)
+        self._sent_text = text
+        self._sent_at = time.monotonic()
+
+    async def on_delta(self, delta):
+        if self.reply is None:
+            self.reply = await self.message.reply_text(self.text[:MAX_MESSAGE_LENGTH])
+            self._sent_text = self.text[:MAX_MESSAGE_LENGTH]
+            self._sent_at = time.monotonic()
+            return
+        if time.monotonic() - self._sent_at >= self.interval and len(self.text) - len(self._sent_text) >= self.min_chars:
+            await self._edit(self.text)
+
+    async def on_finish(self, text):
+        if self.reply is None:
+            await self.message.reply_text(text)
+        else:
+            await self._edit(text)
+
+class GUIStream(ResponseStream):
+    """Дописування токенів у чат GUI через головний цикл Tk."""
+
+    def __init__(self, gui):
+        super().__init__()
+        self.gui = gui
+
+    async def on_delta(self, delta):
+        if self.text == delta:
+            delta = f"Sakura: {delta}"
+        self.gui.root.after(0, self.gui.append_text, delta)
+
+    async def on_finish(self, text):
+        if self.streamed:
+            self.gui.root.after(0, self.gui.append_text, "\n")
+        else:
+            self.gui.root.after(0, self.gui.add_message, f"Sakura: {text}")